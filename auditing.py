@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.special import expit
 
 from .types import LeasedEvidence, ClaimAudit
+from .leasing import log_odds
 
 
 @dataclass
@@ -11,12 +17,101 @@ class AuditConfig:
     tau: float = 0.85
     alpha: float = 0.5
     beta: float = 0.5
+    cache_size: int = 256  # LRU entries of claim-independent audit results; 0 disables
+
+
+@dataclass(frozen=True)
+class _AuditCore:
+    """Claim-independent part of an audit; `support` indexes into the audited evidence list."""
+    posterior: float
+    interval: Tuple[float, float]
+    support: Tuple[int, ...]
+    necessity: Dict[str, bool]
+    sufficiency: Dict[str, bool]
+    cfs: float
+
+
+def _support_prefixes(llr: np.ndarray, prior_lo: float, taus: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Greedy minimal-support order and its length for each tau.
+
+    The order is highest log-odds first (ties keep input order), positive-gain items only; the
+    support for tau is the prefix before the posterior first reaches tau.
+    """
+    order = np.argsort(-llr, kind="stable")
+    order = order[llr[order] > 0]
+    before = expit(prior_lo + np.concatenate([[0.0], np.cumsum(llr[order])[:-1]]))  # non-decreasing
+    return order, np.minimum(np.searchsorted(before, taus, side="left"), len(order))
+
+
+def _audit_cores(
+    likelihoods: Sequence[float], chunk_ids: List[str], prior_lo: float, grid: Sequence[AuditConfig]
+) -> List[_AuditCore]:
+    """Claim-independent audits of one evidence set, one per config in `grid`.
+
+    Configs whose tau gives the same support share its leave-one-out posteriors.
+    """
+    llr = log_odds(likelihoods)
+    total = prior_lo + llr.sum()
+    posterior_full = float(expit(total))
+
+    if not len(llr):
+        interval = (posterior_full, posterior_full)
+    else:
+        removals = expit(total - llr)
+        interval = (float(min(removals.min(), posterior_full)), float(max(removals.max(), posterior_full)))
+
+    order, sizes = _support_prefixes(llr, prior_lo, np.array([cfg.tau for cfg in grid], dtype=np.float64))
+    post_alone = expit(prior_lo + llr[order])
+
+    out = []
+    by_size: Dict[int, Tuple[List[str], np.ndarray, float]] = {}
+    for cfg, n in zip(grid, sizes):
+        n = int(n)
+        if n not in by_size:
+            ms_idx = order[:n]
+            ms_llr = llr[ms_idx]
+            ms_total = prior_lo + ms_llr.sum()
+            # necessity drops every support item sharing the chunk_id (ids are the dict keys)
+            ids = [chunk_ids[i] for i in ms_idx]
+            first: Dict[str, int] = {}
+            group = np.array([first.setdefault(cid, len(first)) for cid in ids], dtype=np.intp)
+            post_removed = expit(ms_total - np.bincount(group, weights=ms_llr, minlength=len(first))[group])
+            by_size[n] = (ids, post_removed, float(expit(ms_total)) if n else posterior_full)
+        ids, post_removed, ms_post = by_size[n]
+
+        necessity: Dict[str, bool] = {}
+        sufficiency: Dict[str, bool] = {}
+        for cid, pr in zip(ids, post_removed):
+            necessity[cid] = bool(pr < cfg.tau)
+        for cid, pa in zip(ids, post_alone[:n]):
+            sufficiency[cid] = bool(pa >= cfg.tau)
+
+        nec_score = 0.0 if not necessity else sum(1.0 for v in necessity.values() if v) / len(necessity)
+        suf_score = 0.0 if not sufficiency else sum(1.0 for v in sufficiency.values() if v) / len(sufficiency)
+        out.append(_AuditCore(
+            posterior=ms_post,
+            interval=interval,
+            support=tuple(int(i) for i in order[:n]),
+            necessity=necessity,
+            sufficiency=sufficiency,
+            cfs=cfg.alpha * nec_score + cfg.beta * suf_score,
+        ))
+    return out
 
 
 class CounterfactualAuditor:
-    """Counterfactual Auditing (CA): minimal-support, necessity/sufficiency, and CFS."""
+    """Counterfactual Auditing (CA): minimal-support, necessity/sufficiency, and CFS.
+
+    Sequential Bayes updates are sums of log-likelihood ratios, so every posterior below is
+    sigmoid(logit(prior) + sum of per-item log-odds): leave-one-out posteriors are a total minus
+    one term, and the greedy minimal support is a prefix of the items sorted by log-odds.
+    """
     def __init__(self, cfg: Optional[AuditConfig] = None):
         self.cfg = cfg or AuditConfig()
+        self._cache: "OrderedDict[tuple, _AuditCore]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     @staticmethod
     def _posterior_from_likelihoods(likelihoods: List[float], prior: float = 0.5) -> float:
@@ -27,7 +122,85 @@ class CounterfactualAuditor:
             p = num / (den + 1e-12)
         return p
 
+    def _support_order(self, llr: np.ndarray, prior_lo: float) -> np.ndarray:
+        order, sizes = _support_prefixes(llr, prior_lo, np.array([self.cfg.tau]))
+        return order[:int(sizes[0])]
+
     def minimal_support(self, evidence: List[LeasedEvidence], prior: float = 0.5) -> List[LeasedEvidence]:
+        llr = log_odds([e.likelihood for e in evidence])
+        return [evidence[i] for i in self._support_order(llr, float(log_odds(prior)))]
+
+    def audit_claim(self, claim: str, evidence: List[LeasedEvidence], prior: float = 0.5) -> ClaimAudit:
+        return self._audit(claim, evidence, prior)[0]
+
+    def audit_claims(
+        self,
+        claims: List[str],
+        evidence: List[LeasedEvidence],
+        prior: float = 0.5,
+        evidence_for: Optional[Callable[[str, List[LeasedEvidence]], List[LeasedEvidence]]] = None,
+        stats: Optional[Dict[str, int]] = None,
+    ) -> List[ClaimAudit]:
+        """Audit several claims. Claims backed by the same evidence set share one cached computation.
+
+        `evidence_for(claim, evidence)` may narrow the evidence per claim; identical subsets are
+        still computed once. Cache hits/misses of this call are added to `stats` if given.
+        """
+        out = []
+        for claim in claims:
+            ev = evidence if evidence_for is None else evidence_for(claim, evidence)
+            audit, hit = self._audit(claim, ev, prior)
+            out.append(audit)
+            if stats is not None:
+                key = "hits" if hit else "misses"
+                stats[key] = stats.get(key, 0) + 1
+        return out
+
+    def cache_info(self) -> Dict[str, int]:
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache), "maxsize": self.cfg.cache_size}
+
+    def cache_clear(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _audit(self, claim: str, evidence: List[LeasedEvidence], prior: float) -> Tuple[ClaimAudit, bool]:
+        likelihoods = [e.likelihood for e in evidence]
+        ids = [e.chunk.chunk_id for e in evidence]
+        core, hit = None, False
+        if self.cfg.cache_size > 0:
+            key = (tuple(likelihoods), tuple(ids), prior, self.cfg.tau, self.cfg.alpha, self.cfg.beta)
+            with self._cache_lock:
+                core = self._cache.get(key)
+                if core is not None:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    hit = True
+                else:
+                    self.cache_misses += 1
+        if core is None:
+            core = self._audit_core(likelihoods, ids, prior)
+            if self.cfg.cache_size > 0:
+                with self._cache_lock:
+                    self._cache[key] = core
+                    while len(self._cache) > self.cfg.cache_size:
+                        self._cache.popitem(last=False)
+        audit = ClaimAudit(
+            claim=claim,
+            posterior=core.posterior,
+            interval=core.interval,
+            minimal_support=[evidence[i] for i in core.support],
+            necessity=dict(core.necessity),
+            sufficiency=dict(core.sufficiency),
+            cfs=core.cfs,
+        )
+        return audit, hit
+
+    def _audit_core(self, likelihoods: List[float], chunk_ids: List[str], prior: float) -> _AuditCore:
+        return _audit_cores(likelihoods, chunk_ids, float(log_odds(prior)), [self.cfg])[0]
+
+    # ---- sequential reference implementation (cross-checks and benchmarks) ----
+
+    def _minimal_support_sequential(self, evidence: List[LeasedEvidence], prior: float = 0.5) -> List[LeasedEvidence]:
         remaining = evidence[:]
         support: List[LeasedEvidence] = []
         current = prior
@@ -49,7 +222,7 @@ class CounterfactualAuditor:
 
         return support
 
-    def audit_claim(self, claim: str, evidence: List[LeasedEvidence], prior: float = 0.5) -> ClaimAudit:
+    def _audit_claim_sequential(self, claim: str, evidence: List[LeasedEvidence], prior: float = 0.5) -> ClaimAudit:
         posterior_full = self._posterior_from_likelihoods([e.likelihood for e in evidence], prior=prior)
 
         if not evidence:
@@ -61,7 +234,7 @@ class CounterfactualAuditor:
                 removals.append(self._posterior_from_likelihoods(lks, prior=prior))
             interval = (min(removals + [posterior_full]), max(removals + [posterior_full]))
 
-        ms = self.minimal_support(evidence, prior=prior)
+        ms = self._minimal_support_sequential(evidence, prior=prior)
 
         necessity: Dict[str, bool] = {}
         sufficiency: Dict[str, bool] = {}
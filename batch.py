@@ -0,0 +1,297 @@
+"""Offline batch evaluation: stream queries from JSONL through BELRAGPipeline and write outputs as JSONL.
+
+    python -m belrag.batch --index idx/ --input queries.jsonl --output answers.jsonl --workers 4
+    python -m belrag.batch --index idx/ --input queries.jsonl --output answers.jsonl --workers 4 --resume
+
+Input lines are JSON objects with a "query" (and optional "id") or bare JSON strings; a line that
+is neither gets an {"id", "error"} record in the output instead of stopping the run. Every worker
+process loads the index saved by `TfidfRetriever.save` memory-mapped, so the CSR arrays are shared
+through the page cache rather than copied per worker. Batches are answered with `run_many` and
+written in input order; at most a few batches per worker are in flight, so memory stays bounded
+however long the input is. Progress is checkpointed to `<output>.ckpt` and `--resume` continues
+from the last checkpoint.
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .pipeline import BELRAGConfig, BELRAGPipeline
+from .retrieval import TfidfRetriever
+from .types import BELRAGOutput
+
+# Worker-process state: the pipeline built over this process's memory-mapped index.
+_WORKER: Dict[str, Any] = {}
+
+# (id, query, error): an input line that could not be read has query None and an error message
+_Item = Tuple[Any, Optional[str], Optional[str]]
+
+
+def config_from_dict(values: Dict[str, Any]) -> BELRAGConfig:
+    """BELRAGConfig from a (JSON) dict; nested sections such as "leasing" are dicts of their fields."""
+    kwargs = {}
+    for f in dataclasses.fields(BELRAGConfig):
+        if f.name not in values:
+            continue
+        value = values[f.name]
+        if isinstance(value, dict) and f.default_factory is not dataclasses.MISSING:
+            value = type(f.default_factory())(**value)
+        kwargs[f.name] = value
+    unknown = set(values) - set(kwargs)
+    if unknown:
+        raise ValueError(f"unknown BELRAGConfig fields: {sorted(unknown)}")
+    return BELRAGConfig(**kwargs)
+
+
+def output_to_record(out: BELRAGOutput, debug: bool = False) -> Dict[str, Any]:
+    """JSON-ready form of an output; chunks are referred to by (doc_id, chunk_id)."""
+    rec = {
+        "answer": out.answer,
+        "claims": [
+            {
+                "claim": a.claim,
+                "posterior": a.posterior,
+                "interval": list(a.interval),
+                "cfs": a.cfs,
+                "minimal_support": [[e.chunk.doc_id, e.chunk.chunk_id] for e in a.minimal_support],
+                "necessity": a.necessity,
+                "sufficiency": a.sufficiency,
+            }
+            for a in out.claims
+        ],
+        "leased": [
+            {
+                "doc_id": e.chunk.doc_id,
+                "chunk_id": e.chunk.chunk_id,
+                "retrieval_score": e.retrieval_score,
+                "likelihood": e.likelihood,
+                "delta_belief": e.delta_belief,
+                "cost": e.cost,
+            }
+            for e in out.leased
+        ],
+        "policy_log": out.policy_log,
+    }
+    if debug:
+        rec["debug"] = out.debug
+    return rec
+
+
+def _init_worker(index: str, cfg: BELRAGConfig, chunk_store: bool, debug: bool) -> None:
+    retriever = TfidfRetriever.load(index, mmap=True, chunk_store=chunk_store, scoring=cfg.retrieval_scoring)
+    _WORKER["pipeline"] = BELRAGPipeline(retriever=retriever, cfg=cfg)
+    _WORKER["debug"] = debug
+
+
+def _run_batch(items: Sequence[_Item]) -> List[str]:
+    """Answer one batch of (id, query, error); returns serialized output lines in item order, so no
+    chunks are pickled back. Items with an error become error records."""
+    outs = iter(_WORKER["pipeline"].run_many([q for _, q, err in items if err is None]))
+    lines = []
+    for qid, q, err in items:
+        if err is not None:
+            lines.append(json.dumps({"id": qid, "error": err}, default=str))
+        else:
+            lines.append(json.dumps({"id": qid, "query": q, **output_to_record(next(outs), _WORKER["debug"])}, default=str))
+    return lines
+
+
+def read_queries(path: str, skip: int = 0) -> Iterator[Tuple[int, Optional[_Item]]]:
+    """Yield (line number, (id, query, error)) from a JSONL file, starting after `skip` lines.
+
+    Blank lines yield None so that line numbers stay checkpointable. The id defaults to the line
+    number. A line that is not a query string or an object with a string "query" yields an error item.
+    """
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(itertools.islice(f, skip, None), start=skip):
+            if not line.strip():
+                yield lineno, None
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                yield lineno, (lineno, None, f"invalid JSON: {e}")
+                continue
+            if isinstance(rec, str):
+                yield lineno, (lineno, rec, None)
+            elif isinstance(rec, dict) and isinstance(rec.get("query"), str):
+                yield lineno, (rec.get("id", lineno), rec["query"], None)
+            else:
+                qid = rec.get("id", lineno) if isinstance(rec, dict) else lineno
+                yield lineno, (qid, None, 'expected a query string or an object with a string "query"')
+
+
+def _batches(queries: Iterator[Tuple[int, Optional[_Item]]], size: int) -> Iterator[Tuple[int, List[_Item]]]:
+    """(lines consumed through this batch, batch items); consecutive batches cover consecutive lines."""
+    items: List[_Item] = []
+    lineno = -1
+    for lineno, item in queries:
+        if item is not None:
+            items.append(item)
+        if len(items) >= size:
+            yield lineno + 1, items
+            items = []
+    if items or lineno >= 0:
+        yield lineno + 1, items
+
+
+class _Checkpoint:
+    """`<output>.ckpt`: input lines consumed and the output size at that point (written atomically)."""
+    def __init__(self, output: str, input_path: str):
+        self.path = output + ".ckpt"
+        self.input_path = os.path.abspath(input_path)
+
+    def load(self) -> Tuple[int, int]:
+        """(lines done, output offset); (0, 0) when there is no checkpoint."""
+        if not os.path.exists(self.path):
+            return 0, 0
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state["input"] != self.input_path:
+            raise ValueError(f"checkpoint {self.path} was written for {state['input']}, not {self.input_path}")
+        return state["lines_done"], state["output_offset"]
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def save(self, lines_done: int, output_offset: int) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"input": self.input_path, "lines_done": lines_done, "output_offset": output_offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+
+def run_batch(
+    index: str,
+    input_path: str,
+    output: str,
+    cfg: Optional[BELRAGConfig] = None,
+    workers: int = 1,
+    batch_size: int = 32,
+    chunk_store: bool = False,
+    resume: bool = False,
+    debug: bool = False,
+    checkpoint_every: int = 1000,
+    report_every_s: float = 10.0,
+    log=sys.stderr,
+) -> Dict[str, float]:
+    """Answer every query of `input_path` into `output`; returns a throughput summary.
+
+    `workers=0` runs in this process. Without `resume`, `output` is overwritten and any old
+    checkpoint is removed. A checkpoint is saved (after an fsync of `output`) every
+    `checkpoint_every` queries and at the end; resuming truncates `output` to the checkpointed size,
+    dropping lines written after it, and skips the input lines already answered. Resuming raises
+    ValueError if `output` is missing or shorter than its checkpoint.
+    """
+    cfg = cfg or BELRAGConfig()
+    ckpt = _Checkpoint(output, input_path)
+    if resume:
+        lines_done, offset = ckpt.load()
+        size = os.path.getsize(output) if os.path.exists(output) else None
+        if offset and (size is None or offset > size):
+            raise ValueError(
+                f"cannot resume: {output} is {'missing' if size is None else f'{size} bytes'} but its checkpoint "
+                f"expects {offset} bytes; rerun without resume"
+            )
+    else:
+        ckpt.clear()
+        lines_done, offset = 0, 0
+    f = open(output, "r+b" if resume and os.path.exists(output) else "wb")
+    f.truncate(offset)
+    f.seek(offset)
+
+    if workers > 0:
+        pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(index, cfg, chunk_store, debug)
+        )
+    else:
+        pool = None
+        _init_worker(index, cfg, chunk_store, debug)
+
+    t0 = last_report = time.perf_counter()
+    done = since_ckpt = 0
+    lines_written = lines_done  # input lines answered and written to `output`
+    pending: "deque[Tuple[int, Future]]" = deque()
+
+    def write(lines_through: int, lines: List[str]) -> None:
+        nonlocal done, since_ckpt, last_report, lines_written
+        for line in lines:
+            f.write(line.encode("utf-8") + b"\n")
+        lines_written = lines_through
+        done += len(lines)
+        since_ckpt += len(lines)
+        if since_ckpt >= checkpoint_every:
+            f.flush()
+            os.fsync(f.fileno())
+            ckpt.save(lines_written, f.tell())
+            since_ckpt = 0
+        now = time.perf_counter()
+        if log is not None and now - last_report >= report_every_s:
+            last_report = now
+            print(json.dumps({"done": done, "qps": done / (now - t0), "elapsed_s": now - t0}), file=log, flush=True)
+
+    try:
+        for lines_through, items in _batches(read_queries(input_path, skip=lines_done), batch_size):
+            if pool is None:
+                write(lines_through, _run_batch(items))
+                continue
+            pending.append((lines_through, pool.submit(_run_batch, items)))
+            while len(pending) >= 2 * workers:  # bounded in flight; written in input order
+                through, fut = pending.popleft()
+                write(through, fut.result())
+        while pending:
+            through, fut = pending.popleft()
+            write(through, fut.result())
+        f.flush()
+        os.fsync(f.fileno())
+        ckpt.save(lines_written, f.tell())
+    finally:
+        f.close()
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - t0
+    return {"queries": done, "seconds": elapsed, "qps": done / elapsed if elapsed else 0.0, "workers": workers}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m belrag.batch", description="BEL-RAG batch evaluation over JSONL")
+    parser.add_argument("--index", required=True, help="index directory written by TfidfRetriever.save")
+    parser.add_argument("--input", required=True, help="JSONL of {\"id\", \"query\"} objects or query strings")
+    parser.add_argument("--output", required=True, help="JSONL of outputs, in input order")
+    parser.add_argument("--config", help="JSON file of BELRAGConfig fields")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes (0: in-process)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--chunk-store", action="store_true", help="hold chunks in a compact ChunkStore per worker")
+    parser.add_argument("--resume", action="store_true", help="continue from <output>.ckpt")
+    parser.add_argument("--debug", action="store_true", help="include BELRAGOutput.debug in each record")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="queries between checkpoints")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines on stderr")
+    args = parser.parse_args(argv)
+
+    cfg = None
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            cfg = config_from_dict(json.load(f))
+    summary = run_batch(
+        args.index, args.input, args.output, cfg=cfg, workers=args.workers, batch_size=args.batch_size,
+        chunk_store=args.chunk_store, resume=args.resume, debug=args.debug,
+        checkpoint_every=args.checkpoint_every, report_every_s=args.report_every,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
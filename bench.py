@@ -0,0 +1,639 @@
+"""Reproducible benchmarks. Results are printed as JSON so runs can be diffed across versions.
+
+    python -m belrag.bench audit --sizes 50 200 1000
+    python -m belrag.bench suite --sizes 1000 100000 1000000 --out suite.json
+    python -m belrag.bench dense --size 100000 --probes 1 4 16 64
+    python -m belrag.bench hybrid --size 100000 --batch 32
+    python -m belrag.bench sharded --size 1000000 --shards 1 2 4 8
+    python -m belrag.bench dedup --size 20000 --dup-rate 0.3 --copies 3
+    python -m belrag.bench sweep --size 20000 --queries 20
+    python -m belrag.bench maxscore --sizes 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .auditing import AuditConfig, CounterfactualAuditor
+from .dedup import DedupIndex
+from .dense import DenseRetriever, HashingEmbedder
+from .hybrid import HybridRetriever
+from .leasing import EvidenceLeaser, LeasingConfig
+from .pipeline import BELRAGConfig, BELRAGPipeline
+from .policy import PolicyEngine
+from .retrieval import TfidfRetriever
+from .sharded import ShardedRetriever
+from .sweep import ConfigSweep, config_grid
+from .types import DocChunk, LeasedEvidence, PolicyMetadata
+
+
+def _timeit(fn: Callable[[], object], repeats: int) -> List[float]:
+    """Wall-clock seconds for each of `repeats` calls."""
+    out = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+def _ms(samples: Sequence[float]) -> Dict[str, float]:
+    arr = np.asarray(samples) * 1e3
+    return {
+        "mean_ms": float(arr.mean()),
+        "p50_ms": float(np.percentile(arr, 50)),
+        "p95_ms": float(np.percentile(arr, 95)),
+        "p99_ms": float(np.percentile(arr, 99)),
+    }
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (monotonic over the run)."""
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB elsewhere
+
+
+def _latency(samples: Sequence[float]) -> Dict[str, float]:
+    out = _ms(samples)
+    out["qps"] = float(len(samples) / max(sum(samples), 1e-12))
+    return out
+
+
+def _environment(seed: int) -> Dict:
+    import scipy
+    import sklearn
+
+    try:
+        from importlib.metadata import version
+        belrag_version = version("belrag")
+    except Exception:
+        belrag_version = "unknown"
+    return {
+        "belrag": belrag_version,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+        "date": _dt.date.today().isoformat(),
+    }
+
+
+# ---- synthetic, policy-annotated corpus ----
+
+# (values, probabilities) for each metadata field
+_LICENSES = (["cc-by", "internal", "proprietary", "cc-by-nc", "unknown"], [0.40, 0.25, 0.15, 0.10, 0.10])
+_TTL_DAYS = ([None, 30, 90, 365, 3650], [0.30, 0.10, 0.15, 0.25, 0.20])
+_JURISDICTIONS = (["US", "EU", "UAE", "CA", None], [0.35, 0.30, 0.10, 0.10, 0.15])
+_SOURCE_CLASSES = (["web", "peer_reviewed", "internal", "news"], [0.45, 0.20, 0.20, 0.15])
+_SYLLABLES = ["ka", "lo", "mi", "re", "su", "ta", "ven", "dor", "pel", "qui", "zan", "bri", "cho", "fle", "gro", "nu"]
+
+
+def _pseudo_words(n: int, rng: np.random.Generator) -> List[str]:
+    words: Dict[str, None] = {}
+    while len(words) < n:
+        k = int(rng.integers(2, 5))
+        words["".join(_SYLLABLES[i] for i in rng.integers(0, len(_SYLLABLES), k))] = None
+    return list(words)
+
+
+def _draw(rng: np.random.Generator, spec, n: int) -> List:
+    values, probs = spec
+    return [values[i] for i in rng.choice(len(values), size=n, p=probs)]
+
+
+def synthetic_corpus(
+    n: int,
+    seed: int = 0,
+    vocab_size: int = 5000,
+    words_per_chunk=(20, 60),
+    pii_rate: float = 0.02,
+    max_age_days: int = 5 * 365,
+) -> List[DocChunk]:
+    """Seeded corpus of `n` chunks with Zipf-distributed pseudo-word texts and policy metadata.
+
+    Creation dates are drawn as ages relative to today, so TTL filtering rejects the same
+    fraction of chunks whichever day the benchmark runs.
+    """
+    rng = np.random.default_rng(seed)
+    vocab = _pseudo_words(vocab_size, rng)
+    freq = 1.0 / np.arange(1, vocab_size + 1) ** 1.1
+    lengths = rng.integers(words_per_chunk[0], words_per_chunk[1] + 1, size=n)
+    words = rng.choice(vocab_size, size=int(lengths.sum()), p=freq / freq.sum())
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+
+    licenses = _draw(rng, _LICENSES, n)
+    ttls = _draw(rng, _TTL_DAYS, n)
+    jurisdictions = _draw(rng, _JURISDICTIONS, n)
+    source_classes = _draw(rng, _SOURCE_CLASSES, n)
+    pii = rng.random(n) < pii_rate
+    today = _dt.date.today().toordinal()
+    created = today - rng.integers(0, max_age_days, size=n)
+
+    return [
+        DocChunk(
+            doc_id=f"doc{i // 4}",
+            chunk_id=f"c{i % 4}",
+            text=" ".join(vocab[w] for w in words[bounds[i]: bounds[i + 1]]),
+            metadata=PolicyMetadata(
+                license=licenses[i],
+                ttl_days=ttls[i],
+                created_at=_dt.date.fromordinal(int(created[i])).isoformat(),
+                contains_pii=bool(pii[i]),
+                jurisdiction=jurisdictions[i],
+                source_class=source_classes[i],
+            ),
+        )
+        for i in range(n)
+    ]
+
+
+def synthetic_queries(chunks: Sequence[DocChunk], n: int, seed: int = 0, words: int = 4, span: bool = False) -> List[str]:
+    """Queries made of words sampled from random chunks, so every query has lexical matches.
+    With `span`, each query is a contiguous passage instead (strong matches, as for quoted text)."""
+    rng = np.random.default_rng(seed + 1)
+    out = []
+    for i in rng.integers(0, len(chunks), size=n):
+        toks = chunks[i].text.split()
+        if span:
+            start = int(rng.integers(0, max(len(toks) - words, 0) + 1))
+            out.append(" ".join(toks[start: start + words]))
+        else:
+            out.append(" ".join(toks[j] for j in rng.integers(0, len(toks), size=words)))
+    return out
+
+
+def duplicated_corpus(chunks: Sequence[DocChunk], dup_rate: float, copies: int, seed: int = 0) -> List[DocChunk]:
+    """`chunks` plus, for a `dup_rate` fraction of them, `copies` near-duplicates each (one word
+    replaced, new doc id, same metadata), as mirrored or re-versioned pages would be."""
+    rng = np.random.default_rng(seed + 2)
+    out = list(chunks)
+    for i in np.flatnonzero(rng.random(len(chunks)) < dup_rate):
+        src = chunks[i]
+        toks = src.text.split()
+        for k in range(copies):
+            toks2 = list(toks)
+            toks2[int(rng.integers(len(toks2)))] = toks[int(rng.integers(len(toks)))]
+            out.append(DocChunk(doc_id=f"{src.doc_id}-mirror{k}", chunk_id=src.chunk_id, text=" ".join(toks2), metadata=src.metadata))
+    return out
+
+
+def bench_suite(sizes: Sequence[int] = (1000, 100_000, 1_000_000), n_queries: int = 100, top_k: int = 15, seed: int = 0) -> Dict:
+    """PAR filtering, TF-IDF fit/search, leasing, auditing and end-to-end runs per corpus size.
+
+    Sizes run in the given order in one process; `peak_rss_mb` is the process peak so far, so
+    pass sizes in ascending order.
+    """
+    results = []
+    for n in sizes:
+        chunks = synthetic_corpus(n, seed=seed)
+        queries = synthetic_queries(chunks, n_queries, seed=seed)
+        row: Dict = {"n_chunks": n, "n_queries": len(queries)}
+
+        t0 = time.perf_counter()
+        retriever = TfidfRetriever(chunks)
+        row["retriever_fit_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        pipe = BELRAGPipeline(retriever=retriever)
+        pipe.cfg.top_k = top_k
+        row["pipeline_build_s"] = time.perf_counter() - t0
+
+        directives = [pipe._profile(q) for q in queries]
+        masks, t_policy = [], []
+        for d in directives:
+            t0 = time.perf_counter()
+            mask, _ = pipe.policy.admissible_mask(retriever.chunks, d, columns=pipe.policy_columns, candidates=retriever.live)
+            t_policy.append(time.perf_counter() - t0)
+            masks.append(mask)
+        row["policy_filter"] = _latency(t_policy)
+        row["admissible_fraction"] = float(np.mean([m.mean() for m in masks]))
+
+        ranked_all, t_search = [], []
+        for q, m in zip(queries, masks):
+            t0 = time.perf_counter()
+            ranked_all.append(retriever.search(q, top_k=top_k, admissible=m))
+            t_search.append(time.perf_counter() - t0)
+        row["search"] = _latency(t_search)
+
+        leased_all, t_lease = [], []
+        for q, ranked in zip(queries, ranked_all):
+            t0 = time.perf_counter()
+            leased_all.append(pipe.leaser.lease(q, ranked)[0])
+            t_lease.append(time.perf_counter() - t0)
+        row["leasing"] = _latency(t_lease)
+
+        auditor = CounterfactualAuditor(AuditConfig(cache_size=0))
+        row["audit"] = _latency([_timeit(lambda: auditor.audit_claim("claim", leased), 1)[0] for leased in leased_all])
+
+        row["end_to_end"] = _latency([_timeit(lambda: pipe.run(q), 1)[0] for q in queries])
+        t0 = time.perf_counter()
+        pipe.run_many(queries)
+        row["end_to_end_batched_qps"] = len(queries) / (time.perf_counter() - t0)
+        row["peak_rss_mb"] = _peak_rss_mb()
+        results.append(row)
+        del chunks, retriever, pipe
+    return {"environment": _environment(seed), "suite": results}
+
+
+def bench_dense(
+    size: int = 100_000,
+    n_queries: int = 100,
+    top_k: int = 10,
+    probes: Sequence[int] = (1, 4, 16, 64),
+    n_lists: Optional[int] = None,
+    dim: int = 256,
+    seed: int = 0,
+) -> Dict:
+    """recall@k and latency of the IVF dense retriever (float32 and int8) against exact brute force.
+
+    Uses `HashingEmbedder`, so recall reflects the index, not embedding quality.
+    """
+    chunks = synthetic_corpus(size, seed=seed)
+    queries = synthetic_queries(chunks, n_queries, seed=seed)
+    embed = HashingEmbedder(dim)
+
+    exact = DenseRetriever(chunks, embed, n_lists=1)
+    truth, t_exact = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        truth.append({id(r.chunk) for r in exact.search(q, top_k)})
+        t_exact.append(time.perf_counter() - t0)
+    rows = []
+    for quantize in (False, True):
+        t0 = time.perf_counter()
+        ann = DenseRetriever(chunks, embed, n_lists=n_lists, quantize=quantize, seed=seed)
+        build_s = time.perf_counter() - t0
+        for n_probe in probes:
+            ann.n_probe = n_probe
+            recalls, lat = [], []
+            for q, want in zip(queries, truth):
+                t0 = time.perf_counter()
+                got = ann.search(q, top_k)
+                lat.append(time.perf_counter() - t0)
+                recalls.append(len(want & {id(r.chunk) for r in got}) / max(len(want), 1))
+            rows.append({
+                "quantize": quantize,
+                "n_lists": len(ann.centroids),
+                "n_probe": n_probe,
+                f"recall@{top_k}": float(np.mean(recalls)),
+                "latency": _latency(lat),
+                "build_s": build_s,
+            })
+    return {
+        "environment": _environment(seed),
+        "dense": {"n_chunks": size, "dim": dim, "exact": _latency(t_exact), "ann": rows, "peak_rss_mb": _peak_rss_mb()},
+    }
+
+
+def bench_hybrid(
+    size: int = 100_000,
+    n_queries: int = 64,
+    batch: int = 32,
+    top_k: int = 10,
+    dim: int = 256,
+    seed: int = 0,
+) -> Dict:
+    """Batched search latency of each arm alone vs fused (linear and RRF), per query."""
+    chunks = synthetic_corpus(size, seed=seed)
+    queries = synthetic_queries(chunks, n_queries, seed=seed)
+    embed = HashingEmbedder(dim)
+    retrievers = {
+        "tfidf": TfidfRetriever(chunks),
+        "dense_exact": DenseRetriever(chunks, embed, n_lists=1),
+        "hybrid_linear": HybridRetriever(chunks, embed, fusion="linear"),
+        "hybrid_rrf": HybridRetriever(chunks, embed, fusion="rrf"),
+    }
+    batches = [queries[i: i + batch] for i in range(0, len(queries), batch)]
+    rows = {}
+    for name, r in retrievers.items():
+        lat = []
+        for qs in batches:
+            t0 = time.perf_counter()
+            r.search_batch(qs, top_k=top_k)
+            lat.append((time.perf_counter() - t0) / len(qs))
+        rows[name] = _latency(lat)
+    return {
+        "environment": _environment(seed),
+        "hybrid": {"n_chunks": size, "batch": batch, "dim": dim, "per_query": rows, "peak_rss_mb": _peak_rss_mb()},
+    }
+
+
+def bench_sharded(
+    size: int = 1_000_000,
+    shards: Sequence[int] = (1, 2, 4, 8),
+    n_queries: int = 64,
+    batch: int = 32,
+    top_k: int = 15,
+    seed: int = 0,
+) -> Dict:
+    """Single-query latency and batched throughput of `ShardedRetriever` vs the unsharded retriever,
+    checking that every shard count returns identical results."""
+    chunks = synthetic_corpus(size, seed=seed)
+    queries = synthetic_queries(chunks, n_queries, seed=seed)
+    batches = [queries[i: i + batch] for i in range(0, len(queries), batch)]
+    key = lambda results: [[(id(r.chunk), r.score) for r in rs] for rs in results]
+
+    def measure(r) -> Dict:
+        lat = []
+        for q in queries:
+            t0 = time.perf_counter()
+            r.search(q, top_k)
+            lat.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        for qs in batches:
+            r.search_batch(qs, top_k=top_k)
+        return {"single": _latency(lat), "batch_qps": len(queries) / (time.perf_counter() - t0)}
+
+    base = TfidfRetriever(chunks)
+    want = key(base.search_batch(queries, top_k=top_k))
+    rows = [{"shards": 0, **measure(base)}]  # 0 = unsharded, in-process
+    for n in shards:
+        t0 = time.perf_counter()
+        # fit once; sharding only reads `base` here since nothing is added or removed
+        with ShardedRetriever.from_retriever(base, n_shards=n) as r:
+            build_s = time.perf_counter() - t0
+            rows.append({
+                "shards": n,
+                **measure(r),
+                "build_s": build_s,
+                "identical": key(r.search_batch(queries, top_k=top_k)) == want,
+            })
+    return {"environment": _environment(seed), "sharded": {"n_chunks": size, "batch": batch, "rows": rows}}
+
+
+def bench_maxscore(
+    sizes: Sequence[int] = (10_000, 100_000, 1_000_000),
+    n_queries: int = 100,
+    top_k: int = 15,
+    seed: int = 0,
+) -> List[Dict]:
+    """Single-query latency of exhaustive scoring vs MaxScore over postings as the corpus grows,
+    unrestricted and under the default policy's admissibility mask, checking identical results."""
+    engine = PolicyEngine()
+    rows = []
+    for size in sizes:
+        chunks = synthetic_corpus(size, seed=seed)
+        queries = synthetic_queries(chunks, n_queries, seed=seed)
+        mask, _ = engine.admissible_mask(chunks, engine.profile_query(""))
+        r = TfidfRetriever(chunks)
+        t0 = time.perf_counter()
+        r._segments[0].postings  # built lazily on the first MaxScore query; timed here instead
+        row = {"n_chunks": size, "postings_build_s": time.perf_counter() - t0}
+        for label, admissible in (("unrestricted", None), ("policy_mask", mask)):
+            results = {}
+            for scoring in TfidfRetriever._SCORING:
+                r.scoring = scoring
+                lat, out = [], []
+                for q in queries:
+                    t0 = time.perf_counter()
+                    out.append(r.search(q, top_k, admissible=admissible))
+                    lat.append(time.perf_counter() - t0)
+                results[scoring] = ([[(id(x.chunk), x.score) for x in rs] for rs in out], lat)
+            row[label] = {
+                "exhaustive": _latency(results["exhaustive"][1]),
+                "maxscore": _latency(results["maxscore"][1]),
+                "speedup_p50": float(np.median(results["exhaustive"][1]) / np.median(results["maxscore"][1])),
+                "identical": results["exhaustive"][0] == results["maxscore"][0],
+            }
+        rows.append(row)
+    return rows
+
+
+def bench_dedup(
+    size: int = 20_000,
+    dup_rate: float = 0.3,
+    copies: int = 3,
+    n_queries: int = 200,
+    top_k: int = 15,
+    seed: int = 0,
+) -> Dict:
+    """Leasing cost, leased items and audit work with and without near-duplicate suppression on
+    a corpus where `dup_rate` of chunks have `copies` near-duplicates."""
+    base = synthetic_corpus(size, seed=seed)
+    chunks = duplicated_corpus(base, dup_rate, copies, seed=seed)
+    # passages of admissible chunks (default policy), so queries have leasable evidence
+    engine = PolicyEngine()
+    mask, _ = engine.admissible_mask(base, engine.profile_query(""))
+    queries = synthetic_queries([base[i] for i in np.flatnonzero(mask)], n_queries, seed=seed, words=12, span=True)
+    t0 = time.perf_counter()
+    DedupIndex(chunks)
+    build_s = time.perf_counter() - t0
+
+    rows = {}
+    for dedup in (False, True):
+        pipe = BELRAGPipeline(chunks, BELRAGConfig(top_k=top_k, dedup=dedup))
+        lat, cost, leased, support, suppressed = [], [], [], [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            out = pipe.run(q)
+            lat.append(time.perf_counter() - t0)
+            cost.append(out.debug["el"]["final_cost"])
+            leased.append(len(out.leased))
+            support.append(sum(len(c.minimal_support) for c in out.claims))
+            suppressed.append(out.debug["el"]["duplicates_suppressed"])
+        rows["dedup" if dedup else "baseline"] = {
+            "mean_leasing_cost": float(np.mean(cost)),
+            "mean_leased": float(np.mean(leased)),
+            "mean_minimal_support": float(np.mean(support)),
+            "mean_duplicates_suppressed": float(np.mean(suppressed)),
+            "latency": _latency(lat),
+        }
+    return {
+        "environment": _environment(seed),
+        "dedup": {
+            "n_chunks": len(chunks),
+            "dup_rate": dup_rate,
+            "copies": copies,
+            "index_build_s": build_s,
+            "leasing_cost_saved": 1.0 - rows["dedup"]["mean_leasing_cost"] / max(rows["baseline"]["mean_leasing_cost"], 1e-12),
+            **rows,
+        },
+    }
+
+
+def bench_sweep(size: int = 20_000, n_queries: int = 20, top_k: int = 25, seed: int = 0) -> Dict:
+    """Leasing x audit config grid per query: one `lease` + `audit_claim` per pair vs `ConfigSweep`."""
+    chunks = synthetic_corpus(size, seed=seed)
+    retriever = TfidfRetriever(chunks)
+    queries = synthetic_queries(chunks, n_queries, seed=seed, words=6, span=True)
+    leasing = config_grid(
+        LeasingConfig(), tau=[0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99], c_max=[1, 2, 3, 5, 10],
+        alpha_cost=[0.0, 0.01, 0.05, 0.1], max_steps=[5, 20],
+    )
+    auditing = config_grid(AuditConfig(cache_size=0), tau=[0.5, 0.7, 0.85, 0.9, 0.99], alpha=[0.3, 0.5], beta=[0.5, 0.7])
+    sweep = ConfigSweep()
+    t_loop, t_sweep, mismatches = [], [], 0
+    for q in queries:
+        ranked = retriever.search(q, top_k=top_k)
+        t0 = time.perf_counter()
+        ref = []
+        for lcfg in leasing:
+            leased, _ = EvidenceLeaser(lcfg).lease(q, ranked)
+            ref.extend(CounterfactualAuditor(acfg).audit_claim(q, leased) for acfg in auditing)
+        t_loop.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        got = sweep.run(q, ranked, leasing, auditing)
+        t_sweep.append(time.perf_counter() - t0)
+        mismatches += sum(a != r.audit for a, r in zip(ref, got))
+    return {
+        "environment": _environment(seed),
+        "sweep": {
+            "n_chunks": size,
+            "leasing_configs": len(leasing),
+            "audit_configs": len(auditing),
+            "per_config_loop": _ms(t_loop),
+            "config_sweep": _ms(t_sweep),
+            "speedup": float(np.sum(t_loop) / np.sum(t_sweep)),
+            "mismatches": mismatches,
+        },
+    }
+
+
+def bench_audit(sizes: Sequence[int] = (50, 200, 1000), repeats: int = 3, seed: int = 0) -> List[Dict]:
+    """Closed-form `audit_claim` vs the sequential reference on n leased items.
+
+    Likelihoods are drawn just above 0.5 so the greedy minimal support needs several rounds.
+    """
+    rng = random.Random(seed)
+    auditor = CounterfactualAuditor()
+    rows = []
+    for n in sizes:
+        evidence = [
+            LeasedEvidence(
+                chunk=DocChunk(doc_id=f"doc{i}", chunk_id=f"c{i}", text="", metadata=PolicyMetadata()),
+                retrieval_score=0.0,
+                likelihood=rng.uniform(0.5, 0.6),
+                delta_belief=0.0,
+                cost=1.0,
+            )
+            for i in range(n)
+        ]
+        ref = auditor._audit_claim_sequential("claim", evidence)
+        new = auditor.audit_claim("claim", evidence)
+        t_ref = _timeit(lambda: auditor._audit_claim_sequential("claim", evidence), repeats)
+        t_new = _timeit(lambda: auditor.audit_claim("claim", evidence), repeats)
+        rows.append({
+            "n_leased": n,
+            "sequential": _ms(t_ref),
+            "closed_form": _ms(t_new),
+            "speedup": float(np.mean(t_ref) / np.mean(t_new)),
+            "max_abs_diff": float(max(abs(ref.posterior - new.posterior), *np.abs(np.subtract(ref.interval, new.interval)))),
+            "same_support": [e.chunk.chunk_id for e in ref.minimal_support] == [e.chunk.chunk_id for e in new.minimal_support],
+        })
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m belrag.bench", description="BEL-RAG benchmarks (JSON output)")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--out", help="also write the JSON result to this file")
+
+    p = sub.add_parser("audit", parents=[common], help="closed-form vs sequential counterfactual audit")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("suite", parents=[common], help="policy/retrieval/leasing/audit/end-to-end on a synthetic corpus")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 100_000, 1_000_000])
+    p.add_argument("--queries", type=int, default=100)
+    p.add_argument("--top-k", type=int, default=15)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("dense", parents=[common], help="IVF dense retriever recall@k vs exact search")
+    p.add_argument("--size", type=int, default=100_000)
+    p.add_argument("--queries", type=int, default=100)
+    p.add_argument("--top-k", type=int, default=10)
+    p.add_argument("--probes", type=int, nargs="+", default=[1, 4, 16, 64])
+    p.add_argument("--n-lists", type=int, default=None)
+    p.add_argument("--dim", type=int, default=256)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("hybrid", parents=[common], help="BM25 + dense fused search vs each arm alone")
+    p.add_argument("--size", type=int, default=100_000)
+    p.add_argument("--queries", type=int, default=64)
+    p.add_argument("--batch", type=int, default=32)
+    p.add_argument("--top-k", type=int, default=10)
+    p.add_argument("--dim", type=int, default=256)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("sharded", parents=[common], help="multi-process sharded retrieval scaling")
+    p.add_argument("--size", type=int, default=1_000_000)
+    p.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--queries", type=int, default=64)
+    p.add_argument("--batch", type=int, default=32)
+    p.add_argument("--top-k", type=int, default=15)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("dedup", parents=[common], help="leasing cost with and without near-duplicate suppression")
+    p.add_argument("--size", type=int, default=20_000)
+    p.add_argument("--dup-rate", type=float, default=0.3)
+    p.add_argument("--copies", type=int, default=3)
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--top-k", type=int, default=15)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("maxscore", parents=[common], help="exhaustive TF-IDF scoring vs MaxScore top-k over postings")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    p.add_argument("--queries", type=int, default=100)
+    p.add_argument("--top-k", type=int, default=15)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("sweep", parents=[common], help="leasing/audit config grid: per-config loop vs ConfigSweep")
+    p.add_argument("--size", type=int, default=20_000)
+    p.add_argument("--queries", type=int, default=20)
+    p.add_argument("--top-k", type=int, default=25)
+    p.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.bench == "audit":
+        result = {"audit": bench_audit(args.sizes, repeats=args.repeats, seed=args.seed)}
+    elif args.bench == "suite":
+        result = bench_suite(args.sizes, n_queries=args.queries, top_k=args.top_k, seed=args.seed)
+    elif args.bench == "dense":
+        result = bench_dense(
+            args.size, n_queries=args.queries, top_k=args.top_k, probes=args.probes,
+            n_lists=args.n_lists, dim=args.dim, seed=args.seed,
+        )
+    elif args.bench == "sharded":
+        result = bench_sharded(
+            args.size, shards=args.shards, n_queries=args.queries, batch=args.batch, top_k=args.top_k, seed=args.seed,
+        )
+    elif args.bench == "dedup":
+        result = bench_dedup(
+            args.size, dup_rate=args.dup_rate, copies=args.copies, n_queries=args.queries, top_k=args.top_k, seed=args.seed,
+        )
+    elif args.bench == "maxscore":
+        result = {
+            "environment": _environment(args.seed),
+            "maxscore": bench_maxscore(args.sizes, n_queries=args.queries, top_k=args.top_k, seed=args.seed),
+        }
+    elif args.bench == "sweep":
+        result = bench_sweep(args.size, n_queries=args.queries, top_k=args.top_k, seed=args.seed)
+    elif args.bench == "hybrid":
+        result = bench_hybrid(
+            args.size, n_queries=args.queries, batch=args.batch, top_k=args.top_k, dim=args.dim, seed=args.seed,
+        )
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
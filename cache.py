@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import datetime as _dt
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Optional, Protocol
+
+from .policy import _parse_date
+from .types import BELRAGOutput, LeasedEvidence
+
+
+def normalize_query(query: str) -> str:
+    """NFKC with whitespace collapsed. Case is kept: the answer may echo the query."""
+    return " ".join(unicodedata.normalize("NFKC", query).split())
+
+
+def _stable(value: Any) -> Any:
+    """Order-independent, process-independent form of a fingerprint (frozensets become sorted tuples)."""
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_stable(v) for v in value), key=repr))
+    if isinstance(value, (list, tuple)):
+        return tuple(_stable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _stable(v)) for k, v in value.items()))
+    return value
+
+
+def cache_key(*parts: Hashable) -> str:
+    """Hex digest of `parts`; stable across processes, so usable as an on-disk key."""
+    return hashlib.sha256(repr(_stable(parts)).encode("utf-8")).hexdigest()
+
+
+def ttl_expiry_day(
+    leased: Iterable[LeasedEvidence], max_ttl_days: Optional[int] = None, exclude_stale: bool = True
+) -> Optional[int]:
+    """First day (ordinal) on which some leased chunk turns stale, i.e. when the result goes stale.
+
+    Uses the policy engine's effective TTL: `max_ttl_days` (the directive's) if set, else the chunk's
+    own. Without `exclude_stale` stale chunks stay admissible, so nothing expires.
+    """
+    if not exclude_stale:
+        return None
+    days = []
+    for e in leased:
+        meta = e.chunk.metadata
+        ttl = max_ttl_days if max_ttl_days is not None else meta.ttl_days
+        created = _parse_date(meta.created_at)
+        if created is not None and ttl is not None:
+            days.append(created.toordinal() + ttl + 1)
+    return min(days) if days else None
+
+
+@dataclass
+class CacheEntry:
+    output: BELRAGOutput
+    corpus_version: Hashable
+    created_at: float              # time.time()
+    expires_day: Optional[int]     # date ordinal from `ttl_expiry_day`
+
+
+class CacheBackend(Protocol):
+    """Key -> CacheEntry store with its own size bound (eviction policy is the backend's).
+
+    Entries are stored as snapshots: `get` returns a fresh copy, never an object a caller holds.
+    """
+    def get(self, key: str) -> Optional[CacheEntry]: ...
+    def put(self, key: str, entry: CacheEntry) -> None: ...
+    def delete(self, key: str) -> None: ...
+    def clear(self) -> None: ...
+    def __len__(self) -> int: ...
+
+
+class MemoryBackend:
+    """In-process LRU of at most `max_entries` entries, kept pickled like `DiskBackend`'s."""
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            blob = self._data.get(key)
+            if blob is None:
+                return None
+            self._data.move_to_end(key)
+        return pickle.loads(blob)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        blob = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data[key] = blob
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskBackend:
+    """Local on-disk LRU (SQLite file of pickled entries), shared by processes on the same host.
+
+    Entries hold pickled outputs: only point it at a file you trust.
+    """
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, used REAL, value BLOB)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        blob = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, time.time(), blob))
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._db.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used LIMIT ?)", (excess,)
+                )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class ResultCache:
+    """End-to-end answer cache for BELRAGPipeline.
+
+    Keys combine the normalized query, the directive fingerprint, the answer-relevant config and
+    `namespace`. An entry is discarded on lookup when the corpus version differs from the one it
+    was computed against, when it is older than `ttl_s`, or when a leased chunk's TTL has expired.
+    Versions are per retriever instance: give a `DiskBackend` that outlives the process a
+    `namespace` identifying the index build.
+    """
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl_s: Optional[float] = None, namespace: str = ""):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl_s = ttl_s
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0  # entries dropped on lookup (corpus change, age, chunk TTL)
+
+    def key(self, query: str, *parts: Hashable) -> str:
+        return cache_key(self.namespace, normalize_query(query), *parts)
+
+    def get(self, key: str, corpus_version: Hashable) -> Optional[BELRAGOutput]:
+        entry = self.backend.get(key)
+        if entry is not None and not self._valid(entry, corpus_version):
+            self.backend.delete(key)
+            with self._lock:
+                self.invalidated += 1
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry.output if entry is not None else None
+
+    def _valid(self, entry: CacheEntry, corpus_version: Hashable) -> bool:
+        if entry.corpus_version != corpus_version:
+            return False
+        if self.ttl_s is not None and time.time() - entry.created_at > self.ttl_s:
+            return False
+        return entry.expires_day is None or _dt.date.today().toordinal() < entry.expires_day
+
+    def put(
+        self,
+        key: str,
+        output: BELRAGOutput,
+        corpus_version: Hashable,
+        max_ttl_days: Optional[int] = None,
+        exclude_stale: bool = True,
+    ) -> None:
+        """Store `output`; `max_ttl_days`/`exclude_stale` are the directive's, so the entry expires
+        when the policy would start rejecting one of its leased chunks."""
+        expires = ttl_expiry_day(output.leased, max_ttl_days, exclude_stale)
+        self.backend.put(key, CacheEntry(output, corpus_version, time.time(), expires))
+
+    def info(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidated": self.invalidated,
+            "size": len(self.backend),
+        }
+
+    def clear(self) -> None:
+        self.backend.clear()
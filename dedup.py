@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from .retrieval import RetrievalResult
+from .types import DocChunk
+
+_PRIME = np.uint64((1 << 31) - 1)  # Mersenne prime; a * x stays below 2**62 for x, a < 2**31
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenation of arange(s, s + c) for each (s, c)."""
+    total = int(counts.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+
+class MinHasher:
+    """MinHash signatures over word shingles (`shingle_size`-grams of lowercased tokens)."""
+    def __init__(self, num_perm: int = 32, shingle_size: int = 3, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+
+    def _shingles(self, text: str) -> List[int]:
+        toks = text.lower().split()
+        k = min(self.shingle_size, len(toks))
+        if k == 0:
+            return [0]
+        return [zlib.crc32(" ".join(toks[i: i + k]).encode("utf-8")) for i in range(len(toks) - k + 1)]
+
+    def signatures(self, texts: Sequence[str], batch_size: int = 1024) -> np.ndarray:
+        """(n, num_perm) uint32 signatures; each batch is hashed in one vectorized pass."""
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for lo in range(0, len(texts), batch_size):
+            shingles = [self._shingles(t) for t in texts[lo: lo + batch_size]]
+            starts = np.cumsum([0] + [len(s) for s in shingles[:-1]])
+            x = np.fromiter((h for s in shingles for h in s), dtype=np.uint64) % _PRIME
+            hashed = (self._a * x + self._b) % _PRIME  # (num_perm, total shingles)
+            out[lo: lo + len(shingles)] = np.minimum.reduceat(hashed, starts, axis=1).T
+        return out
+
+
+class DedupIndex:
+    """Near-duplicate clusters over chunks via MinHash + banded LSH, built at ingest.
+
+    Chunks whose signatures collide in any of `bands` bands become candidates; a candidate pair is
+    merged into one cluster when its estimated Jaccard similarity is at least `threshold`
+    (estimated from 16-bit signature slices kept per row). A new row is compared with the
+    `bucket_probes` latest rows of each of its buckets, so a bucket of boilerplate text costs at
+    most `bands * bucket_probes` pairs per row rather than one per member; chained this way, a
+    cluster only splits on removal once `bucket_probes` consecutive members are gone. `collapse`
+    keeps the best-ranked result of each cluster in a ranked stream. `remove` drops rows and
+    recomputes only the clusters that contained them, from the similar pairs that remain.
+    """
+    def __init__(
+        self,
+        chunks: Iterable[Optional[DocChunk]] = (),
+        threshold: float = 0.8,
+        num_perm: int = 32,
+        bands: int = 8,
+        shingle_size: int = 3,
+        seed: int = 0,
+        bucket_probes: int = 4,
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.bucket_probes = max(1, bucket_probes)
+        self.hasher = MinHasher(num_perm, shingle_size, seed)
+        self._row_of: Dict[Tuple[str, str], int] = {}
+        self._sig = np.empty((0, num_perm), dtype=np.uint16)
+        self._parent = np.empty(0, dtype=np.int64)
+        self._removed = np.empty(0, dtype=bool)
+        self._edges = np.empty((0, 2), dtype=np.int64)  # accepted similar pairs, for rebuilds on removal
+        self._band_keys = [np.empty(0, dtype=np.uint64) for _ in range(bands)]  # sorted
+        self._band_rows = [np.empty(0, dtype=np.int64) for _ in range(bands)]
+        self._band_dead = 0  # removed rows still in the band arrays (purged once they are a quarter)
+        self.add([c for c in chunks if c is not None])
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def _band_hashes(self, sig: np.ndarray) -> np.ndarray:
+        r = sig.shape[1] // self.bands
+        h = np.zeros((len(sig), self.bands), dtype=np.uint64)
+        for j in range(r):  # polynomial hash of each band's r values (wraps mod 2**64)
+            h = h * np.uint64(0x100000001B3) + sig[:, j::r][:, : self.bands].astype(np.uint64)
+        return h
+
+    def add(self, chunks: Sequence[DocChunk]) -> None:
+        """Index `chunks` and merge them into existing clusters; a re-added key gets a new row."""
+        chunks = list(chunks)
+        if not chunks:
+            return
+        start = len(self._parent)
+        sig = self.hasher.signatures([c.text for c in chunks])
+        rows = np.arange(start, start + len(chunks), dtype=np.int64)
+        self._sig = np.concatenate([self._sig, (sig & 0xFFFF).astype(np.uint16)])
+        self._parent = np.concatenate([self._parent, rows])
+        self._removed = np.concatenate([self._removed, np.zeros(len(chunks), dtype=bool)])
+        replaced = []
+        for row, c in zip(rows, chunks):
+            old = self._row_of.get((c.doc_id, c.chunk_id))
+            if old is not None:
+                replaced.append(old)
+            self._row_of[(c.doc_id, c.chunk_id)] = int(row)
+
+        band_hashes = self._band_hashes(sig)
+        pairs_a, pairs_b = [], []
+        for b in range(self.bands):
+            order = np.argsort(band_hashes[:, b], kind="stable")
+            keys, new_rows = band_hashes[order, b], rows[order]
+            old_keys, old_rows = self._band_keys[b], self._band_rows[b]
+            # against earlier rows: the last rows of the bucket [left, right) (rows are kept in
+            # insertion order within a bucket, so these are its latest)
+            left = np.searchsorted(old_keys, keys, side="left")
+            right = np.searchsorted(old_keys, keys, side="right")
+            start = np.maximum(left, right - self.bucket_probes)
+            pairs_a.append(old_rows[_ranges(start, right - start)])
+            pairs_b.append(np.repeat(new_rows, right - start))
+            # within this batch: each row with the last rows before it in its bucket
+            same = np.concatenate([[False], keys[1:] == keys[:-1]])
+            pos = np.arange(len(keys))
+            first = np.maximum.accumulate(np.where(same, 0, pos))
+            start = np.maximum(first, pos - self.bucket_probes)
+            pairs_a.append(new_rows[_ranges(start, pos - start)])
+            pairs_b.append(np.repeat(new_rows, pos - start))
+            at = np.searchsorted(old_keys, keys, side="right")
+            self._band_keys[b] = np.insert(old_keys, at, keys)
+            self._band_rows[b] = np.insert(old_rows, at, new_rows)
+
+        a, b = np.concatenate(pairs_a), np.concatenate(pairs_b)
+        if len(a):
+            n = np.int64(len(self._parent))
+            code = np.unique(a * n + b)  # one pair per (earlier row, new row)
+            pairs = np.stack([code // n, code % n], axis=1)
+            pairs = pairs[~self._removed[pairs[:, 0]]]
+            sim = (self._sig[pairs[:, 0]] == self._sig[pairs[:, 1]]).mean(axis=1)
+            edges = pairs[sim >= self.threshold]
+            self._edges = np.concatenate([self._edges, edges])
+            self._relabel(self._roots_of(edges))  # merge the clusters each pair joins
+        if replaced:
+            self._drop(replaced)
+
+    def remove(self, keys: Iterable[Tuple[str, str]]) -> int:
+        """Forget chunks by (doc_id, chunk_id); clusters are rebuilt without them. Returns how many were indexed."""
+        rows = [r for r in (self._row_of.pop(tuple(k), None) for k in keys) if r is not None]
+        if rows:
+            self._drop(rows)
+        return len(rows)
+
+    def _roots_of(self, rows: np.ndarray) -> np.ndarray:
+        """Roots of `rows` (any shape), following `_parent` for all of them at once."""
+        while True:
+            up = self._parent[rows]
+            if np.array_equal(up, rows):
+                return rows
+            rows = up
+
+    def _drop(self, rows: Sequence[int]) -> None:
+        # a removed row may have linked its cluster together: recompute the connected components of
+        # the clusters that contained dropped rows from their remaining pairs, rooting each at its
+        # earliest row; other clusters are untouched
+        rows = np.asarray(rows, dtype=np.int64)
+        # members of the clusters involved: the dropped rows and the ends of their clusters' pairs
+        inside = np.isin(self._roots_of(self._edges[:, 0]), self._roots_of(rows))
+        member = np.zeros(len(self._parent), dtype=bool)
+        member[rows] = True
+        member[self._edges[inside]] = True
+        nodes = np.flatnonzero(member)
+        self._removed[rows] = True
+        self._band_dead += len(rows)
+        if 4 * self._band_dead > len(self._band_rows[0]):  # until then, pairs with removed rows are skipped
+            for b in range(self.bands):
+                keep = ~self._removed[self._band_rows[b]]
+                self._band_keys[b], self._band_rows[b] = self._band_keys[b][keep], self._band_rows[b][keep]
+            self._band_dead = 0
+        keep = ~self._removed[self._edges].any(axis=1)
+        self._relabel(self._edges[inside & keep], nodes)
+        self._edges = self._edges[keep]
+
+    def _relabel(self, edges: np.ndarray, nodes: Optional[np.ndarray] = None) -> None:
+        """Point every row of `nodes` (default: the rows in `edges`) at the earliest row of its
+        connected component under `edges`; rows of `nodes` that no edge touches become roots."""
+        if nodes is None:
+            nodes = np.unique(edges)
+        if not len(nodes):
+            return
+        local = np.searchsorted(nodes, edges)
+        graph = sp.coo_matrix((np.ones(len(local), dtype=np.int8), (local[:, 0], local[:, 1])), shape=(len(nodes),) * 2)
+        _, label = connected_components(graph, directed=False)
+        earliest = np.full(label.max() + 1, len(self._parent), dtype=np.int64)
+        np.minimum.at(earliest, label, nodes)
+        self._parent[nodes] = earliest[label]
+
+    def _find(self, row: int) -> int:
+        parent = self._parent
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = int(parent[row])
+        return row
+
+    def cluster_of(self, chunk: DocChunk) -> Optional[int]:
+        """Cluster id (earliest row of the cluster) of an indexed chunk, else None."""
+        row = self._row_of.get((chunk.doc_id, chunk.chunk_id))
+        return None if row is None else self._find(row)
+
+    def n_clusters(self) -> int:
+        return int(((self._parent == np.arange(len(self._parent))) & ~self._removed).sum())
+
+    def collapse(self, ranked: Iterable[RetrievalResult], stats: Optional[Dict[str, int]] = None) -> Iterator[RetrievalResult]:
+        """Lazily drop results whose cluster already appeared earlier in `ranked`.
+
+        `stats["duplicates_suppressed"]` counts the dropped results pulled so far.
+        """
+        seen = set()
+        for r in ranked:
+            cluster = self.cluster_of(r.chunk)
+            if cluster is not None:
+                if cluster in seen:
+                    if stats is not None:
+                        stats["duplicates_suppressed"] = stats.get("duplicates_suppressed", 0) + 1
+                    continue
+                seen.add(cluster)
+            yield r
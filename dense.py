@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import threading
+import zlib
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from .retrieval import Admissible, RetrievalResult, docno_index, iter_top_k, own_chunks, present_results, resolve_admissible, tombstoned, top_k_indices
+from .types import DocChunk
+
+# Maps a batch of texts to an (n, dim) array of embeddings.
+EmbedFn = Callable[[Sequence[str]], np.ndarray]
+
+
+class HashingEmbedder:
+    """Offline stand-in for an embedding model: signed feature hashing of unigrams + bigrams.
+
+    Deterministic and dependency-free, so the dense path can run without a model; plug a real
+    embedding function in for semantic retrieval.
+    """
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for r, text in enumerate(texts):
+            toks = text.lower().split()
+            for tok in toks + [a + " " + b for a, b in zip(toks, toks[1:])]:
+                h = zlib.crc32(tok.encode("utf-8"))
+                out[r, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        return out
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    x = np.ascontiguousarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
+
+
+class DenseRetriever:
+    """Dense cosine retriever over a contiguous float32 (or int8-quantized) embedding matrix.
+
+    With `n_lists > 1` an inverted-file (IVF) index is built by spherical k-means: a query scores
+    only the rows in its `n_probe` closest lists (more lists are probed when the admissibility
+    filter leaves fewer than `top_k` candidates). `n_probe` trades recall for latency;
+    `n_probe >= n_lists` is exact brute-force search. Doc numbers, admissibility masks and
+    incremental updates follow `TfidfRetriever`.
+    """
+    def __init__(
+        self,
+        chunks: Sequence[DocChunk],
+        embed_fn: EmbedFn,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        quantize: bool = False,
+        kmeans_iters: int = 10,
+        seed: int = 0,
+        embed_batch_size: int = 1024,
+    ):
+        self.embed_fn = embed_fn
+        self.n_probe = n_probe
+        self.quantize = quantize
+        self.embed_batch_size = embed_batch_size
+        self._lock = threading.RLock()
+
+        self.chunks: List[Optional[DocChunk]] = own_chunks(chunks)
+        self.live = np.ones(len(self.chunks), dtype=bool)
+        self._docno_of = docno_index(self.chunks)
+        self.version = 0
+
+        emb = self._embed([c.text for c in self.chunks])
+        if n_lists is None:
+            n_lists = int(np.sqrt(len(self.chunks))) if len(self.chunks) >= 1024 else 1
+        self.centroids = self._kmeans(emb, max(1, min(n_lists, len(self.chunks))), kmeans_iters, seed)
+        self._store(emb)
+        self._assign = self._nearest_list(emb)
+        self._build_lists()
+
+    # ---- index construction ----
+
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        parts = [
+            _normalize(self.embed_fn(texts[i: i + self.embed_batch_size]))
+            for i in range(0, len(texts), self.embed_batch_size)
+        ]
+        return np.concatenate(parts) if parts else np.zeros((0, 0), dtype=np.float32)
+
+    @staticmethod
+    def _kmeans(emb: np.ndarray, k: int, iters: int, seed: int, sample_per_list: int = 64) -> np.ndarray:
+        """Spherical k-means (cosine) on a sample of at most `sample_per_list * k` rows; unit-norm centroids."""
+        if k <= 1 or len(emb) == 0:
+            return _normalize(emb.mean(axis=0, keepdims=True)) if len(emb) else np.zeros((1, 0), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        if len(emb) > sample_per_list * k:
+            emb = emb[np.sort(rng.choice(len(emb), size=sample_per_list * k, replace=False))]
+        centroids = emb[rng.choice(len(emb), size=k, replace=False)].copy()
+        for _ in range(iters):
+            assign = np.argmax(emb @ centroids.T, axis=1)
+            onehot = sp.csr_matrix((np.ones(len(emb), dtype=np.float32), (assign, np.arange(len(emb)))), shape=(k, len(emb)))
+            sums = np.asarray(onehot @ emb)
+            empty = np.bincount(assign, minlength=k) == 0
+            sums[empty] = emb[rng.choice(len(emb), size=int(empty.sum()))]  # re-seed empty lists
+            centroids = _normalize(sums)
+        return centroids
+
+    def _store(self, emb: np.ndarray) -> None:
+        if self.quantize:
+            scale = np.abs(emb).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            self._codes = np.round(emb / scale[:, None]).astype(np.int8)
+            self._scale = scale.astype(np.float32)
+        else:
+            self._emb = emb
+
+    def _append_store(self, emb: np.ndarray) -> None:
+        if self.quantize:
+            codes, scale = self._codes, self._scale
+            self._store(emb)
+            self._codes = np.concatenate([codes, self._codes])
+            self._scale = np.concatenate([scale, self._scale])
+        else:
+            self._emb = np.concatenate([self._emb, emb])
+
+    def _nearest_list(self, emb: np.ndarray, block: int = 65536) -> np.ndarray:
+        parts = [np.argmax(emb[i: i + block] @ self.centroids.T, axis=1) for i in range(0, len(emb), block)]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+
+    def _build_lists(self) -> None:
+        """CSR-style list layout: rows of list j are `_list_rows[_list_ptr[j]:_list_ptr[j+1]]` (ascending)."""
+        self._list_rows = np.argsort(self._assign, kind="stable")
+        self._list_ptr = np.concatenate([[0], np.cumsum(np.bincount(self._assign, minlength=len(self.centroids)))])
+
+    # ---- incremental updates ----
+
+    def add_chunks(self, chunks: Sequence[DocChunk]) -> np.ndarray:
+        """Embed and index `chunks` (assigned to the existing lists); existing keys are replaced."""
+        chunks = list(chunks)
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        emb = self._embed([c.text for c in chunks])
+        with self._lock:
+            self._tombstone([(c.doc_id, c.chunk_id) for c in chunks])
+            start = len(self.chunks)
+            docnos = np.arange(start, start + len(chunks), dtype=np.int64)
+            self.chunks.extend(chunks)
+            self.live = np.concatenate([self.live, np.ones(len(chunks), dtype=bool)])
+            for i, c in zip(docnos, chunks):
+                self._docno_of[(c.doc_id, c.chunk_id)] = int(i)
+            self._append_store(emb)
+            self._assign = np.concatenate([self._assign, self._nearest_list(emb)])
+            self._build_lists()
+            self.version += 1
+        return docnos
+
+    def update_chunk(self, chunk: DocChunk) -> int:
+        return int(self.add_chunks([chunk])[0])
+
+    def remove_chunks(self, keys: Iterable[Tuple[str, str]]) -> int:
+        with self._lock:
+            n = self._tombstone(keys)
+            if n:
+                self.version += 1
+        return n
+
+    def _tombstone(self, keys: Iterable[Tuple[str, str]]) -> int:
+        self.chunks, self.live, n = tombstoned(self.chunks, self.live, self._docno_of, keys)
+        return n
+
+    # ---- search ----
+
+    def _candidates(self, q: np.ndarray, allowed: np.ndarray, top_k: int) -> np.ndarray:
+        """Allowed rows in the closest lists (ascending doc number)."""
+        n_lists = len(self.centroids)
+        if self.n_probe >= n_lists:
+            return np.flatnonzero(allowed)
+        order = np.argsort(-(self.centroids @ q), kind="stable")
+        picked, found = [], 0
+        for j, lst in enumerate(order):
+            rows = self._list_rows[self._list_ptr[lst]: self._list_ptr[lst + 1]]
+            rows = rows[allowed[rows]]
+            picked.append(rows)
+            found += len(rows)
+            if j + 1 >= self.n_probe and found >= top_k:
+                break
+        return np.sort(np.concatenate(picked)) if picked else np.empty(0, dtype=np.intp)
+
+    def _scores(self, q: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        full = len(rows) == len(self.live)  # every row is a candidate: skip the gather
+        if self.quantize:
+            codes, scale = (self._codes, self._scale) if full else (self._codes[rows], self._scale[rows])
+            return (codes.astype(np.float32) @ q) * scale
+        return (self._emb if full else self._emb[rows]) @ q
+
+    def score_all(self, queries: np.ndarray, block: int = 16384) -> np.ndarray:
+        """Exact cosine of each (normalised) query embedding against every row: shape (n_queries, n_rows).
+
+        Accumulates in float64 and rounds to float32, so a query's scores do not depend on which
+        other queries share the batch (BLAS blocking would otherwise flip near-ties).
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float64)
+        with self._lock:
+            store = self._codes if self.quantize else self._emb
+            scale = self._scale if self.quantize else None
+        out = np.empty((len(queries), len(store)), dtype=np.float32)
+        for i in range(0, len(store), block):
+            part = store[i: i + block].astype(np.float64) @ queries.T
+            if scale is not None:
+                part *= scale[i: i + block, None]
+            out[:, i: i + block] = part.T
+        return out
+
+    def _rank(self, q: np.ndarray, admissible: Admissible, top_k: int):
+        with self._lock:
+            live, chunks = self.live, self.chunks
+            mask = resolve_admissible(admissible, len(live), self._docno_of)
+            allowed = live if mask is None else live & mask
+            rows = self._candidates(q, allowed, top_k)
+            scores = self._scores(q, rows)
+        return rows, scores, chunks
+
+    def search(self, query: str, top_k: int = 10, admissible: Admissible = None) -> List[RetrievalResult]:
+        return self.search_batch([query], top_k=top_k, admissible=[admissible])[0]
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 10,
+        admissible: Optional[Sequence[Admissible]] = None,
+    ) -> List[List[RetrievalResult]]:
+        """Embed all queries in one call, then probe/score per query."""
+        if admissible is not None and len(admissible) != len(queries):
+            raise ValueError(f"got {len(admissible)} admissible specs for {len(queries)} queries")
+        if not queries:
+            return []
+        qs = self._embed(list(queries))
+        out = []
+        for qi, q in enumerate(qs):
+            rows, scores, chunks = self._rank(q, admissible[qi] if admissible is not None else None, top_k)
+            idx = top_k_indices(scores, top_k)
+            out.append(present_results(chunks, rows[idx], scores[idx]))
+        return out
+
+    def iter_search(
+        self,
+        query: str,
+        top_k: int = 10,
+        admissible: Admissible = None,
+        block_size: int = 8,
+    ) -> Iterator[RetrievalResult]:
+        rows, scores, chunks = self._rank(self._embed([query])[0], admissible, top_k)
+        for block in iter_top_k(scores, top_k, block_size):
+            for i in block:
+                yield RetrievalResult(chunk=chunks[rows[i]], score=float(scores[i]))
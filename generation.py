@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 from .types import ClaimAudit, LeasedEvidence
 
@@ -12,16 +12,24 @@ class GenerationConfig:
 
 
 class SimpleGenerator:
-    """Offline generator (no external LLM) + structured calibrated report."""
+    """Offline generator (no external LLM) + structured calibrated report.
+
+    LLM adapters override `stream_draft` to forward text as it is generated; `draft_answer` joins it.
+    """
     def __init__(self, cfg: Optional[GenerationConfig] = None):
         self.cfg = cfg or GenerationConfig()
 
-    def draft_answer(self, query: str, leased: List[LeasedEvidence]) -> str:
+    def stream_draft(self, query: str, leased: List[LeasedEvidence]) -> Iterator[str]:
+        """Yield the draft in pieces (the heading, then one bullet per piece)."""
         if not leased:
-            return f"I could not find sufficient admissible evidence to answer: {query}"
-        top = leased[: min(3, len(leased))]
-        bullets = "\n".join([f"- {e.chunk.text.strip()[:240]}" for e in top])
-        return f"Answer (evidence-grounded draft):\n{bullets}"
+            yield f"I could not find sufficient admissible evidence to answer: {query}"
+            return
+        yield "Answer (evidence-grounded draft):"
+        for e in leased[: min(3, len(leased))]:
+            yield f"\n- {e.chunk.text.strip()[:240]}"
+
+    def draft_answer(self, query: str, leased: List[LeasedEvidence]) -> str:
+        return "".join(self.stream_draft(query, leased))
 
     def segment_claims(self, answer: str) -> List[str]:
         lines = [ln.strip("- ").strip() for ln in answer.splitlines() if ln.strip().startswith("-")]
@@ -30,13 +38,16 @@ class SimpleGenerator:
             lines = [s.strip() for s in re.split(r"(?<=[.!?])\s+", answer) if s.strip()]
         return lines[: self.cfg.max_claims]
 
+    def format_claim(self, index: int, audit: ClaimAudit) -> str:
+        """Report entry of the `index`-th (1-based) audited claim."""
+        ms_ids = [f"{e.chunk.doc_id}:{e.chunk.chunk_id}" for e in audit.minimal_support]
+        return (
+            f"{index}. {audit.claim}\n"
+            f"   Belief={audit.posterior:.3f}  Interval=[{audit.interval[0]:.3f},{audit.interval[1]:.3f}]  CFS={audit.cfs:.3f}\n"
+            f"   Minimal-support={', '.join(ms_ids) if ms_ids else '∅'}"
+        )
+
     def format_report(self, answer: str, audits: List[ClaimAudit]) -> str:
         out = [answer, "", "Calibrated claim report:"]
-        for i, a in enumerate(audits, 1):
-            ms_ids = [f"{e.chunk.doc_id}:{e.chunk.chunk_id}" for e in a.minimal_support]
-            out.append(
-                f"{i}. {a.claim}\n"
-                f"   Belief={a.posterior:.3f}  Interval=[{a.interval[0]:.3f},{a.interval[1]:.3f}]  CFS={a.cfs:.3f}\n"
-                f"   Minimal-support={', '.join(ms_ids) if ms_ids else '∅'}"
-            )
+        out.extend(self.format_claim(i, a) for i, a in enumerate(audits, 1))
         return "\n".join(out)
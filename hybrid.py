@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import threading
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer
+
+from .dense import DenseRetriever, EmbedFn
+from .retrieval import Admissible, RetrievalResult, iter_top_k, present_results, resolve_admissible, top_k_indices
+from .types import DocChunk
+
+
+class BM25Scorer:
+    """Okapi BM25 with the document side (saturated tf x idf) precomputed as a CSR matrix,
+    so a batch of queries is scored with one sparse product. Vocabulary, IDF and average
+    document length are frozen at fit time; `add` appends rows."""
+    def __init__(self, texts: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.vectorizer = CountVectorizer(stop_words="english")
+        tf = self.vectorizer.fit_transform(texts).tocsr()
+        n = tf.shape[0]
+        df = np.bincount(tf.indices, minlength=tf.shape[1])
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self.avgdl = float(tf.sum()) / max(n, 1) or 1.0
+        self.mat = self._weights(tf)
+
+    def _weights(self, tf: sp.csr_matrix) -> sp.csr_matrix:
+        tf = tf.astype(np.float32)
+        dl = np.asarray(tf.sum(axis=1)).ravel()
+        rows = np.repeat(np.arange(tf.shape[0]), np.diff(tf.indptr))
+        norm = self.k1 * (1.0 - self.b + self.b * dl[rows] / self.avgdl)
+        tf.data = tf.data * (self.k1 + 1.0) / (tf.data + norm) * self.idf[tf.indices]
+        return tf
+
+    def add(self, texts: Sequence[str]) -> None:
+        self.mat = sp.vstack([self.mat, self._weights(self.vectorizer.transform(texts).tocsr())], format="csr")
+
+    def score(self, queries: Sequence[str]) -> sp.csr_matrix:
+        """BM25 of each query (distinct terms) against every row: sparse (n_queries, n_rows)."""
+        q = self.vectorizer.transform(queries)
+        q.data[:] = 1
+        return (q.astype(np.float32) @ self.mat.T).tocsr()
+
+
+class HybridRetriever:
+    """Lexical (BM25) + dense retrieval over shared doc numbers, fused in one batched pass.
+
+    Fusion (`fusion`):
+    - "linear": `weight * max(cosine, 0) + (1 - weight) * bm25 / (bm25 + bm25_saturation)`;
+      both terms lie in [0, 1), like TF-IDF cosine, so `DefaultCalibrator` applies unchanged.
+    - "rrf": reciprocal-rank fusion over each arm's top `rrf_depth`, divided by its maximum
+      2 / (rrf_k + 1) so a chunk ranked first by both arms scores 1.0.
+
+    Dense scores are exact (brute force over the embedding matrix) so every lexical candidate
+    has a dense score. Incremental updates go to both arms.
+    """
+    def __init__(
+        self,
+        chunks: Sequence[DocChunk],
+        embed_fn: EmbedFn,
+        fusion: str = "linear",
+        weight: float = 0.5,
+        bm25_saturation: float = 5.0,
+        rrf_k: int = 60,
+        rrf_depth: int = 100,
+        quantize: bool = False,
+    ):
+        if fusion not in ("linear", "rrf"):
+            raise ValueError(f"unknown fusion {fusion!r}; expected 'linear' or 'rrf'")
+        self.fusion = fusion
+        self.weight = weight
+        self.bm25_saturation = bm25_saturation
+        self.rrf_k = rrf_k
+        self.rrf_depth = rrf_depth
+        self._lock = threading.RLock()
+        self.dense = DenseRetriever(chunks, embed_fn, n_lists=1, quantize=quantize)
+        self.lexical = BM25Scorer([c.text for c in chunks])
+
+    @property
+    def chunks(self) -> List[Optional[DocChunk]]:
+        return self.dense.chunks
+
+    @property
+    def live(self) -> np.ndarray:
+        return self.dense.live
+
+    @property
+    def version(self) -> int:
+        return self.dense.version
+
+    # ---- incremental updates ----
+
+    def add_chunks(self, chunks: Sequence[DocChunk]) -> np.ndarray:
+        chunks = list(chunks)
+        with self._lock:
+            docnos = self.dense.add_chunks(chunks)
+            self.lexical.add([c.text for c in chunks])
+        return docnos
+
+    def update_chunk(self, chunk: DocChunk) -> int:
+        return int(self.add_chunks([chunk])[0])
+
+    def remove_chunks(self, keys: Iterable[Tuple[str, str]]) -> int:
+        with self._lock:  # `_score` reads the dense arm's chunks and live together under this lock
+            return self.dense.remove_chunks(keys)
+
+    # ---- search ----
+
+    def _fuse(self, lex: np.ndarray, den: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Fused scores for candidate `rows`."""
+        lex, den = lex[rows], den[rows]
+        if self.fusion == "linear":
+            return self.weight * np.maximum(den, 0.0) + (1.0 - self.weight) * lex / (lex + self.bm25_saturation)
+        fused = np.zeros(len(rows), dtype=np.float64)
+        for arm in (lex, den):
+            top = top_k_indices(arm, self.rrf_depth)
+            if arm is lex:
+                top = top[arm[top] > 0]  # no lexical match is not a rank
+            fused[top] += 1.0 / (self.rrf_k + 1.0 + np.arange(len(top)))
+        return fused * (self.rrf_k + 1.0) / 2.0
+
+    def _score(self, queries: Sequence[str]):
+        with self._lock:
+            live, chunks, docno_of = self.live, self.chunks, self.dense._docno_of
+            lex_all = self.lexical.score(queries)
+            den_all = self.dense.score_all(self.dense._embed(list(queries)))
+        return lex_all, den_all, live, chunks, docno_of
+
+    def _ranked(self, lex_all, den_all, live, docno_of, qi: int, admissible: Admissible):
+        mask = resolve_admissible(admissible, len(live), docno_of)
+        rows = np.flatnonzero(live if mask is None else live & mask)
+        lex = lex_all[qi].toarray().ravel()
+        return rows, self._fuse(lex, den_all[qi], rows)
+
+    def search(self, query: str, top_k: int = 10, admissible: Admissible = None) -> List[RetrievalResult]:
+        return self.search_batch([query], top_k=top_k, admissible=[admissible])[0]
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 10,
+        admissible: Optional[Sequence[Admissible]] = None,
+    ) -> List[List[RetrievalResult]]:
+        """Score both arms for all queries at once (one sparse product, one dense matmul), then fuse."""
+        if admissible is not None and len(admissible) != len(queries):
+            raise ValueError(f"got {len(admissible)} admissible specs for {len(queries)} queries")
+        if not queries:
+            return []
+        lex_all, den_all, live, chunks, docno_of = self._score(queries)
+        out = []
+        for qi in range(len(queries)):
+            rows, fused = self._ranked(lex_all, den_all, live, docno_of, qi, admissible[qi] if admissible is not None else None)
+            idx = top_k_indices(fused, top_k)
+            out.append(present_results(chunks, rows[idx], fused[idx]))
+        return out
+
+    def iter_search(
+        self,
+        query: str,
+        top_k: int = 10,
+        admissible: Admissible = None,
+        block_size: int = 8,
+    ) -> Iterator[RetrievalResult]:
+        lex_all, den_all, live, chunks, docno_of = self._score([query])
+        rows, fused = self._ranked(lex_all, den_all, live, docno_of, 0, admissible)
+        for block in iter_top_k(fused, top_k, block_size):
+            for i in block:
+                yield RetrievalResult(chunk=chunks[rows[i]], score=float(fused[i]))
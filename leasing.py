@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Callable, List, Tuple, Optional
+from typing import Callable, Iterable, List, Tuple, Optional, Sequence, Union
 
 import math
+from itertools import islice
+
+import numpy as np
+from scipy.special import expit
 
 from .types import DocChunk, LeasedEvidence
 from .retrieval import RetrievalResult
@@ -13,6 +17,15 @@ def sigmoid(x: float) -> float:
     return 1.0 / (1.0 + math.exp(-x))
 
 
+LOG_ODDS_EPS = 1e-12
+
+
+def log_odds(p) -> np.ndarray:
+    """Elementwise logit, with p clipped to [eps, 1-eps] so certain evidence stays finite."""
+    p = np.clip(np.asarray(p, dtype=np.float64), LOG_ODDS_EPS, 1.0 - LOG_ODDS_EPS)
+    return np.log(p) - np.log1p(-p)
+
+
 @dataclass
 class LeasingConfig:
     tau: float = 0.85            # confidence threshold (τ)
@@ -20,6 +33,7 @@ class LeasingConfig:
     alpha_cost: float = 0.1      # trade-off weight in utility
     per_snippet_cost: float = 1.0
     max_steps: int = 20
+    calibration_batch_size: Optional[int] = 8  # candidates pulled + calibrated per step; None = max_steps at once
 
 
 class DefaultCalibrator:
@@ -28,40 +42,87 @@ class DefaultCalibrator:
         x = 8.0 * (retrieval_score - 0.35)  # center around ~0.35 similarity
         return float(sigmoid(x))
 
+    def calibrate_batch(self, query: str, chunks: Sequence[DocChunk], scores: np.ndarray) -> np.ndarray:
+        return expit(8.0 * (np.asarray(scores, dtype=np.float64) - 0.35))
+
+
+class PerItemCalibrator:
+    """Adapts a per-item calibrator `(query, chunk, score) -> likelihood` to the batch protocol."""
+    def __init__(self, fn: Callable[[str, DocChunk, float], float]):
+        self.fn = fn
+
+    def __call__(self, query: str, chunk: DocChunk, retrieval_score: float) -> float:
+        return float(self.fn(query, chunk, retrieval_score))
+
+    def calibrate_batch(self, query: str, chunks: Sequence[DocChunk], scores: np.ndarray) -> np.ndarray:
+        return np.array([float(self.fn(query, c, float(s))) for c, s in zip(chunks, scores)], dtype=np.float64)
+
+
+def as_batch_calibrator(calibrator: Union[Callable, object]):
+    """Return `calibrator` if it implements `calibrate_batch(query, chunks, scores) -> ndarray`, else wrap it."""
+    if callable(getattr(calibrator, "calibrate_batch", None)):
+        return calibrator
+    return PerItemCalibrator(calibrator)
+
 
 class EvidenceLeaser:
-    """Sequential Bayesian Evidence Leasing (EL) with utility gating and stop criteria."""
+    """Sequential Bayesian Evidence Leasing (EL) with utility gating and stop criteria.
+
+    `ranked` may be a lazy iterator (e.g. `TfidfRetriever.iter_search`): candidates are pulled and
+    calibrated in batches (`LeasingConfig.calibration_batch_size`) only until a stop criterion fires;
+    the gating then runs on log-odds.
+    """
     def __init__(self, config: Optional[LeasingConfig] = None, calibrator: Optional[Callable] = None):
         self.cfg = config or LeasingConfig()
-        self.calibrator = calibrator or DefaultCalibrator()
-
-    def _bayes_update(self, prior: float, likelihood: float) -> float:
-        num = likelihood * prior
-        den = num + (1.0 - likelihood) * (1.0 - prior)
-        return num / (den + 1e-12)
+        self.calibrator = as_batch_calibrator(calibrator or DefaultCalibrator())
 
-    def lease(self, query: str, ranked: List[RetrievalResult], prior: float = 0.5) -> Tuple[List[LeasedEvidence], dict]:
+    def lease(self, query: str, ranked: Iterable[RetrievalResult], prior: float = 0.5) -> Tuple[List[LeasedEvidence], dict]:
         leased: List[LeasedEvidence] = []
         belief = prior
+        belief_lo = float(log_odds(prior))
         cost = 0.0
-        debug = {"belief_trace": [belief], "cost_trace": [cost]}
+        debug = {"belief_trace": [belief], "cost_trace": [cost], "calibrator_calls": 0, "calibrated": 0}
 
-        for rr in ranked[: self.cfg.max_steps]:
+        source = iter(ranked)
+        batch = self.cfg.calibration_batch_size or self.cfg.max_steps
+        candidates: List[RetrievalResult] = []
+        likelihoods = np.empty(0)
+        llrs = np.empty(0)
+
+        i = 0
+        while i < self.cfg.max_steps:
             if belief >= self.cfg.tau:
                 break
             if cost + self.cfg.per_snippet_cost > self.cfg.c_max:
                 break
 
-            lk = float(self.calibrator(query, rr.chunk, rr.score))
-            new_belief = self._bayes_update(belief, lk)
+            if i >= len(candidates):
+                block = list(islice(source, min(batch, self.cfg.max_steps - len(candidates))))
+                if not block:
+                    break
+                candidates.extend(block)
+                lks = np.asarray(
+                    self.calibrator.calibrate_batch(query, [r.chunk for r in block], np.array([r.score for r in block])),
+                    dtype=np.float64,
+                )
+                likelihoods = np.concatenate([likelihoods, lks])
+                llrs = np.concatenate([llrs, log_odds(lks)])
+                debug["calibrator_calls"] += 1
+                debug["calibrated"] += len(block)
+
+            rr = candidates[i]
+            lk = float(likelihoods[i])
+            new_lo = belief_lo + float(llrs[i])
+            new_belief = sigmoid(new_lo)
             delta = new_belief - belief
             utility = delta - self.cfg.alpha_cost * self.cfg.per_snippet_cost
+            i += 1
 
             if utility <= 0:
                 continue  # do not lease
 
             cost += self.cfg.per_snippet_cost
-            belief = new_belief
+            belief, belief_lo = new_belief, new_lo
             leased.append(
                 LeasedEvidence(
                     chunk=rr.chunk,
@@ -78,4 +139,5 @@ class EvidenceLeaser:
         debug["final_cost"] = cost
         debug["tau"] = self.cfg.tau
         debug["c_max"] = self.cfg.c_max
+        debug["candidates_materialized"] = len(candidates)
         return leased, debug
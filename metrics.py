@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Deque, Dict, Iterable, Iterator, Optional, Protocol, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+class MetricsSink(Protocol):
+    """Receives one observation per stage/counter per pipeline call."""
+    def observe(self, name: str, value: float) -> None: ...
+
+
+class NullSink:
+    """Default sink: drops everything."""
+    def observe(self, name: str, value: float) -> None:
+        pass
+
+
+class HistogramSink:
+    """In-memory sink keeping the last `max_samples` observations per metric for percentile summaries."""
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            q = self._samples.get(name)
+            if q is None:
+                q = self._samples[name] = deque(maxlen=self.max_samples)
+            q.append(value)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """count/mean/p50/p95/p99 per metric."""
+        with self._lock:
+            snapshot = {k: np.fromiter(v, dtype=np.float64) for k, v in self._samples.items()}
+        out = {}
+        for name, arr in snapshot.items():
+            if not len(arr):
+                continue
+            p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+            out[name] = {"count": int(len(arr)), "mean": float(arr.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99)}
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class StageTimer:
+    """Per-call stage timings (monotonic clock, ms) and counters. Disabled timers do no work."""
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.timings_ms: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def stage(self, name: str):
+        return self._stage(name) if self.enabled else nullcontext()
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, (time.perf_counter() - t0) * 1e3)
+
+    def add_time(self, name: str, ms: float) -> None:
+        if self.enabled:
+            self.timings_ms[name] = self.timings_ms.get(name, 0.0) + ms
+
+    def count(self, name: str, n: int) -> None:
+        if self.enabled:
+            self.counts[name] = self.counts.get(name, 0) + int(n)
+
+    def timed_iter(self, name: str, it: Iterable[T]) -> Iterator[T]:
+        """Wrap a lazy iterator, charging the time spent producing each item to stage `name`."""
+        if not self.enabled:
+            yield from it
+            return
+        it = iter(it)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add_time(name, (time.perf_counter() - t0) * 1e3)
+                return
+            self.add_time(name, (time.perf_counter() - t0) * 1e3)
+            yield item
+
+    def export(self, sink: Optional[MetricsSink]) -> Dict[str, Dict]:
+        """Push this call's measurements to `sink` and return them for `BELRAGOutput.debug`."""
+        if not self.enabled:
+            return {}
+        if sink is not None and not isinstance(sink, NullSink):
+            for name, ms in self.timings_ms.items():
+                sink.observe(f"stage.{name}_ms", ms)
+            for name, n in self.counts.items():
+                sink.observe(f"count.{name}", float(n))
+        return {"timings_ms": dict(self.timings_ms), "counts": dict(self.counts)}
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Sequence
+import asyncio
+import threading
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, AsyncIterator, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .types import BELRAGOutput, DocChunk
-from .policy import PolicyEngine
-from .retrieval import TfidfRetriever
+import numpy as np
+
+from .types import BELRAGOutput, DocChunk, RetrievalDirective, StreamEvent
+from .policy import PolicyColumns, PolicyEngine, directive_fingerprint
+from .retrieval import RetrievalResult, Retriever, TfidfRetriever, live_chunks
 from .leasing import EvidenceLeaser, LeasingConfig
 from .auditing import CounterfactualAuditor, AuditConfig
 from .generation import SimpleGenerator, GenerationConfig
+from .metrics import MetricsSink, NullSink, StageTimer
+from .serving import AsyncPipeline, ServingConfig
+from .cache import ResultCache
+from .dedup import DedupIndex
+from .sharded import ShardedRetriever
+from .sweep import ConfigSweep, SweepResult
 
 
 @dataclass
@@ -20,33 +30,114 @@ class BELRAGConfig:
     max_ttl_days: Optional[int] = None
     allowed_licenses: Optional[List[str]] = None
     allowed_jurisdictions: Optional[List[str]] = None
+    policy_cache_size: int = 64  # LRU admissibility decisions per distinct directive; 0 disables
 
     # Retrieval
     top_k: int = 15
+    refit_per_query: bool = False  # legacy: refit TF-IDF on the admissible subset (IDF over admissible docs only)
+    retrieval_block_size: int = 8  # results ranked per block when streaming candidates into leasing
+    retrieval_scoring: str = "exhaustive"  # default TF-IDF retriever: "exhaustive" or "maxscore" (same results)
+    dedup: bool = False            # collapse near-duplicate chunks (MinHash/LSH, built at ingest) before leasing
+    dedup_threshold: float = 0.8   # estimated Jaccard similarity of word shingles to count as duplicates
 
     # EL
-    leasing: LeasingConfig = LeasingConfig()
+    leasing: LeasingConfig = field(default_factory=LeasingConfig)
 
     # CA
-    auditing: AuditConfig = AuditConfig()
+    auditing: AuditConfig = field(default_factory=AuditConfig)
 
     # CG
-    generation: GenerationConfig = GenerationConfig()
+    generation: GenerationConfig = field(default_factory=GenerationConfig)
+
+    # Async serving (arun): micro-batching, coalescing, backpressure
+    serving: ServingConfig = field(default_factory=ServingConfig)
+
+    # Instrumentation: per-stage timings/counters in BELRAGOutput.debug and the metrics sink
+    instrument: bool = True
 
 
 class BELRAGPipeline:
-    def __init__(self, corpus: Sequence[DocChunk], cfg: Optional[BELRAGConfig] = None):
-        self.corpus = list(corpus)
+    def __init__(
+        self,
+        corpus: Optional[Sequence[DocChunk]] = None,
+        cfg: Optional[BELRAGConfig] = None,
+        retriever: Optional[Retriever] = None,
+        metrics: Optional[MetricsSink] = None,
+        cache: Optional[ResultCache] = None,
+    ):
+        """Build over `corpus` (TF-IDF), or over a prebuilt `retriever` whose chunks become the corpus,
+        e.g. `TfidfRetriever.load(path)`, a `DenseRetriever` or a `HybridRetriever`.
+
+        `metrics` receives per-call stage timings and counters (e.g. `HistogramSink` for p50/p95/p99).
+        A `ChunkStore` corpus is kept as is (no per-chunk objects) and grows with `add_chunks`.
+        `cache` (a `ResultCache`) answers repeated queries without re-running the pipeline.
+        """
+        if retriever is None and corpus is None:
+            raise ValueError("BELRAGPipeline needs a corpus or a retriever")
         self.cfg = cfg or BELRAGConfig()
+        self.base_retriever = (
+            retriever if retriever is not None else TfidfRetriever(corpus, scoring=self.cfg.retrieval_scoring)
+        )
 
-        self.policy = PolicyEngine()
-        self.base_retriever = TfidfRetriever(self.corpus)
+        self.policy = PolicyEngine(cache_size=self.cfg.policy_cache_size)
+        self.policy_columns = PolicyColumns(self.base_retriever.chunks)
+        self.dedup = DedupIndex(self.base_retriever.chunks, threshold=self.cfg.dedup_threshold) if self.cfg.dedup else None
+        self._lock = threading.Lock()  # keeps policy columns aligned with the retriever's doc numbers
         self.leaser = EvidenceLeaser(self.cfg.leasing)
         self.auditor = CounterfactualAuditor(self.cfg.auditing)
         self.generator = SimpleGenerator(self.cfg.generation)
+        self.metrics = metrics or NullSink()
+        self.cache = cache
+        self._async: Optional[AsyncPipeline] = None
+        self._check_refit()
 
-    def run(self, query: str) -> BELRAGOutput:
-        directive = self.policy.profile_query(
+    def _check_refit(self) -> None:
+        # the legacy refit path rebuilds a TfidfRetriever over the admissible chunks, which would
+        # silently turn a dense or hybrid pipeline lexical
+        if self.cfg.refit_per_query and not isinstance(self.base_retriever, (TfidfRetriever, ShardedRetriever)):
+            raise ValueError(
+                f"refit_per_query rebuilds a TF-IDF index and cannot be used with {type(self.base_retriever).__name__}"
+            )
+
+    @property
+    def corpus(self) -> List[DocChunk]:
+        """The chunks currently indexed (removed ones left out)."""
+        return live_chunks(self.base_retriever)
+
+    def add_chunks(self, chunks: Sequence[DocChunk]) -> np.ndarray:
+        """Index new chunks (replacing any with the same doc/chunk id) without a refit."""
+        chunks = list(chunks)
+        if not hasattr(self.base_retriever, "add_chunks"):
+            raise TypeError(f"{type(self.base_retriever).__name__} does not support incremental indexing")
+        with self._lock:
+            docnos = self.base_retriever.add_chunks(chunks)
+            self.policy_columns.extend(chunks)
+            if self.dedup is not None:
+                self.dedup.add(chunks)
+        return docnos
+
+    def update_chunk(self, chunk: DocChunk) -> int:
+        return int(self.add_chunks([chunk])[0])
+
+    def remove_chunks(self, keys: Iterable[Tuple[str, str]]) -> int:
+        """Remove chunks by (doc_id, chunk_id), e.g. when they expire."""
+        if not hasattr(self.base_retriever, "remove_chunks"):
+            raise TypeError(f"{type(self.base_retriever).__name__} does not support incremental indexing")
+        keys = [tuple(k) for k in keys]
+        with self._lock:
+            n = self.base_retriever.remove_chunks(keys)
+            if self.dedup is not None:
+                self.dedup.remove(keys)
+        return n
+
+    def _admissible_mask(self, directive: RetrievalDirective):
+        with self._lock:
+            return self.policy.admissible_mask(
+                self.base_retriever.chunks, directive, columns=self.policy_columns, candidates=self.base_retriever.live
+            )
+
+    def _profile(self, query: str) -> RetrievalDirective:
+        return self.policy.profile_query(
             query=query,
             prefer_peer_reviewed=self.cfg.prefer_peer_reviewed,
             forbid_pii=self.cfg.forbid_pii,
@@ -55,23 +146,242 @@ class BELRAGPipeline:
             allowed_licenses=self.cfg.allowed_licenses,
             allowed_jurisdictions=self.cfg.allowed_jurisdictions,
         )
-        admissible, par_log = self.policy.filter_admissible(self.corpus, directive)
 
-        retriever = TfidfRetriever(admissible) if admissible else self.base_retriever
-        ranked = retriever.search(query, top_k=self.cfg.top_k)
+    def _answer(
+        self,
+        query: str,
+        directive: RetrievalDirective,
+        par_log: Dict,
+        ranked: Iterable[RetrievalResult],
+        timer: StageTimer,
+    ) -> BELRAGOutput:
+        for event in self._answer_events(query, directive, par_log, ranked, timer):
+            pass
+        return event.output
+
+    def _draft_pieces(self, query: str, leased) -> Iterable[str]:
+        stream = getattr(self.generator, "stream_draft", None)
+        return stream(query, leased) if stream is not None else [self.generator.draft_answer(query, leased)]
+
+    def _answer_events(
+        self,
+        query: str,
+        directive: RetrievalDirective,
+        par_log: Dict,
+        ranked: Iterable[RetrievalResult],
+        timer: StageTimer,
+    ) -> Iterator[StreamEvent]:
+        """Lease, draft, audit and report; yields draft pieces and claims as they are ready, then the output."""
+        # lazily streamed retrieval runs inside lease(); charge it to "search", not "leasing"
+        search_before = timer.timings_ms.get("search", 0.0)
+        ranked = timer.timed_iter("search", ranked)
+        dedup_stats = {"duplicates_suppressed": 0}
+        if self.dedup is not None:
+            ranked = self.dedup.collapse(ranked, dedup_stats)
+        with timer.stage("leasing"):
+            leased, el_debug = self.leaser.lease(query, ranked, prior=0.5)
+        timer.add_time("leasing", search_before - timer.timings_ms.get("search", 0.0))
+        el_debug["top_k"] = self.cfg.top_k
+        el_debug["duplicates_suppressed"] = dedup_stats["duplicates_suppressed"]
 
-        leased, el_debug = self.leaser.lease(query, ranked, prior=0.5)
+        pieces = []
+        for piece in timer.timed_iter("drafting", self._draft_pieces(query, leased)):
+            pieces.append(piece)
+            yield StreamEvent("draft", text=piece)
+        draft = "".join(pieces)
+        with timer.stage("segmentation"):
+            claims = self.generator.segment_claims(draft)
 
-        draft = self.generator.draft_answer(query, leased)
-        claims = self.generator.segment_claims(draft)
+        audit_stats = {"hits": 0, "misses": 0}
+        audits = []
+        for i, claim in enumerate(claims, 1):
+            with timer.stage("auditing"):
+                audit = self.auditor.audit_claims([claim], leased, prior=0.5, stats=audit_stats)[0]
+            audits.append(audit)
+            yield StreamEvent("claim", text=self.generator.format_claim(i, audit), audit=audit)
+        with timer.stage("report"):
+            report = self.generator.format_report(draft, audits)
 
-        audits = [self.auditor.audit_claim(c, leased, prior=0.5) for c in claims]
-        report = self.generator.format_report(draft, audits)
+        timer.count("chunks_kept", par_log["kept"])
+        timer.count("chunks_rejected", par_log["rejected"])
+        timer.count("candidates_materialized", el_debug["candidates_materialized"])
+        timer.count("calibrator_calls", el_debug["calibrator_calls"])
+        timer.count("claims_audited", len(audits))
+        timer.count("duplicates_suppressed", dedup_stats["duplicates_suppressed"])
+        debug = {
+            "el": el_debug,
+            "audit_cache": {**audit_stats, "size": self.auditor.cache_info()["size"]},
+            "policy_cache": self.policy.cache_info(),
+        }
+        debug.update(timer.export(self.metrics))
 
-        return BELRAGOutput(
+        yield StreamEvent("output", output=BELRAGOutput(
             answer=report,
             claims=audits,
             leased=leased,
             policy_log={**directive.log, **par_log},
-            debug={"el": el_debug},
+            debug=debug,
+        ))
+
+    def _corpus_version(self) -> Hashable:
+        return getattr(self.base_retriever, "version", None), len(self.base_retriever.live)
+
+    def _cache_lookup(
+        self, query: str, directive: RetrievalDirective, timer: StageTimer
+    ) -> Tuple[Optional[Tuple[str, Any, RetrievalDirective]], Optional[BELRAGOutput]]:
+        """((key, corpus version, directive) to store a fresh result under, cached output or None)."""
+        if self.cache is None:
+            return None, None
+        cfg = self.cfg
+        with timer.stage("result_cache"):
+            key = self.cache.key(
+                query, directive_fingerprint(directive), cfg.top_k, cfg.refit_per_query, cfg.dedup, cfg.dedup_threshold,
+                asdict(cfg.leasing), asdict(cfg.auditing), asdict(cfg.generation),
+            )
+            version = self._corpus_version()
+            cached = self.cache.get(key, version)
+        if cached is None:
+            return (key, version, directive), None
+        debug = {**cached.debug, "counts": {}, **timer.export(self.metrics)}
+        debug["result_cache"] = {**self.cache.info(), "hit": True}
+        return None, replace(cached, debug=debug)
+
+    def _cache_store(self, slot: Optional[Tuple[str, Any, RetrievalDirective]], out: BELRAGOutput) -> BELRAGOutput:
+        if slot is not None:
+            key, version, directive = slot
+            out.debug["result_cache"] = {**self.cache.info(), "hit": False}
+            self.cache.put(key, out, version, max_ttl_days=directive.max_ttl_days, exclude_stale=directive.exclude_stale)
+        return out
+
+    def run(self, query: str) -> BELRAGOutput:
+        for event in self.run_stream(query):
+            pass
+        return event.output
+
+    def run_stream(self, query: str) -> Iterator[StreamEvent]:
+        """`run`, yielding the draft as the generator produces it, then each claim as soon as its
+        audit finishes (with its report entry), and last the output `run` would return.
+        A cached answer yields only the output."""
+        timer = StageTimer(self.cfg.instrument)
+        with timer.stage("par_profile"):
+            directive = self._profile(query)
+        slot, cached = self._cache_lookup(query, directive, timer)
+        if cached is not None:
+            yield StreamEvent("output", output=cached)
+            return
+        if self.cfg.refit_per_query:
+            self._check_refit()
+            with timer.stage("par_filter"), self._lock:
+                admissible, par_log = self.policy.filter_admissible(
+                    self.base_retriever.chunks, directive, columns=self.policy_columns, candidates=self.base_retriever.live
+                )
+            with timer.stage("retriever_build"):
+                retriever = TfidfRetriever(admissible) if admissible else self.base_retriever
+            with timer.stage("search"):
+                ranked = retriever.search(query, top_k=self.cfg.top_k)
+        else:
+            with timer.stage("par_filter"):
+                mask, par_log = self._admissible_mask(directive)
+            ranked = self.base_retriever.iter_search(
+                query, top_k=self.cfg.top_k, admissible=mask, block_size=self.cfg.retrieval_block_size
+            )
+        for event in self._answer_events(query, directive, par_log, ranked, timer):
+            if event.output is not None:
+                self._cache_store(slot, event.output)
+            yield event
+
+    def run_many(self, queries: Sequence[str]) -> List[BELRAGOutput]:
+        """Answer a burst of queries; retrieval is scored in one batched pass, the rest runs per query.
+
+        Cached queries are answered first and left out of the batch. The batched search time is
+        split evenly across the remaining queries' `search` timings.
+        """
+        if self.cfg.refit_per_query:
+            return [self.run(q) for q in queries]
+        outputs: List[Optional[BELRAGOutput]] = [None] * len(queries)
+        pending = []  # (position, query, directive, cache slot, timer)
+        for i, q in enumerate(queries):
+            timer = StageTimer(self.cfg.instrument)
+            with timer.stage("par_profile"):
+                d = self._profile(q)
+            slot, outputs[i] = self._cache_lookup(q, d, timer)
+            if outputs[i] is None:
+                pending.append((i, q, d, slot, timer))
+        if not pending:
+            return outputs
+        masks, par_logs = [], []
+        for _, _, d, _, timer in pending:
+            with timer.stage("par_filter"):
+                mask, par_log = self._admissible_mask(d)
+            masks.append(mask)
+            par_logs.append(par_log)
+        batch_timer = StageTimer(self.cfg.instrument)
+        with batch_timer.stage("search"):
+            ranked_all = self.base_retriever.search_batch(
+                [p[1] for p in pending], top_k=self.cfg.top_k, admissible=masks
+            )
+        for _, _, _, _, timer in pending:
+            timer.add_time("search", batch_timer.timings_ms.get("search", 0.0) / len(pending))
+        for (i, q, d, slot, timer), log, ranked in zip(pending, par_logs, ranked_all):
+            outputs[i] = self._cache_store(slot, self._answer(q, d, log, ranked, timer))
+        return outputs
+
+    def sweep(
+        self,
+        query: str,
+        leasing: Sequence[LeasingConfig],
+        auditing: Sequence[AuditConfig] = (AuditConfig(),),
+    ) -> List[SweepResult]:
+        """Profile, filter and retrieve once for `query`, then lease and audit under every config pair
+        (see `ConfigSweep`). Results are labelled with the query rather than drafted claims."""
+        directive = self._profile(query)
+        mask, _ = self._admissible_mask(directive)
+        ranked = self.base_retriever.iter_search(
+            query, top_k=self.cfg.top_k, admissible=mask, block_size=self.cfg.retrieval_block_size
         )
+        if self.dedup is not None:
+            ranked = self.dedup.collapse(ranked)
+        return ConfigSweep(self.leaser.calibrator).run(query, ranked, leasing, auditing, prior=0.5)
+
+    async def arun(self, query: str) -> BELRAGOutput:
+        """Async `run`: concurrent calls are micro-batched through `run_many` off the event loop
+        (see `ServingConfig`). Callers of an identical in-flight query share its output object.
+
+        The front-end belongs to the first loop that calls this. Calling from another loop raises
+        RuntimeError while that loop is still open (`aclose` it there first); once it is closed,
+        its front-end is released and a new one is started.
+        """
+        loop = asyncio.get_running_loop()
+        front = self._async
+        if front is not None and not front.closed and front.loop not in (None, loop):
+            if not front.loop.is_closed():
+                raise RuntimeError("arun is serving another event loop; await aclose() on that loop first")
+            front.abandon()
+        if front is None or front.closed or front.loop not in (None, loop):
+            front = self._async = AsyncPipeline(self, self.cfg.serving)
+        return await front.run(query)
+
+    async def arun_stream(self, query: str) -> AsyncIterator[StreamEvent]:
+        """Async `run_stream`; each step runs on the loop's default executor, off the event loop."""
+        loop = asyncio.get_running_loop()
+        events = self.run_stream(query)
+        done = object()
+        try:
+            while True:
+                event = await loop.run_in_executor(None, next, events, done)
+                if event is done:
+                    return
+                yield event
+        finally:
+            if not events.gi_running:  # still running on the executor if this consumer was cancelled
+                events.close()
+
+    async def aclose(self) -> None:
+        """Stop the async front-end started by `arun` (waits for running batches)."""
+        front, self._async = self._async, None
+        if front is None:
+            return
+        if front.loop is not None and front.loop.is_closed():
+            front.abandon()
+        else:
+            await front.close()
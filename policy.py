@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 import datetime as _dt
-from dataclasses import dataclass
-from typing import Callable, Dict, List, Optional, Tuple
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from .types import DocChunk, PolicyMetadata, RetrievalDirective
 
@@ -16,17 +21,142 @@ def _parse_date(d: Optional[str]) -> Optional[_dt.date]:
         return None
 
 
+class _Categorical:
+    """Dictionary-encoded string column: int32 codes + code lookup."""
+    def __init__(self, values: Sequence[Hashable]):
+        self.index: Dict[Hashable, int] = {}
+        self._values: List[Hashable] = []
+        self.codes = self._encode(values)
+
+    @property
+    def values(self) -> List[Hashable]:
+        """Distinct values in code order."""
+        return self._values
+
+    def value(self, code: int) -> Hashable:
+        return self._values[code]
+
+    def _code(self, v: Hashable) -> int:
+        code = self.index.get(v)
+        if code is None:
+            code = self.index[v] = len(self._values)
+            self._values.append(v)
+        return code
+
+    def _encode(self, values: Sequence[Hashable]) -> np.ndarray:
+        return np.fromiter((self._code(v) for v in values), dtype=np.int32, count=len(values))
+
+    def extend(self, values: Sequence[Hashable]) -> None:
+        self.codes = np.concatenate([self.codes, self._encode(values)])
+
+    def isin(self, allowed: Sequence[Hashable]) -> np.ndarray:
+        table = np.zeros(len(self.index), dtype=bool)
+        for v in allowed:
+            code = self.index.get(v)
+            if code is not None:
+                table[code] = True
+        return table[self.codes]
+
+
+class PolicyColumns:
+    """Columnar view of chunk metadata, built once per corpus, so built-in rules evaluate as array masks.
+
+    Rows follow a retriever's doc numbers; removed chunks (None slots) get default metadata and are
+    kept out of results by the retriever's live mask, passed to the engine as `candidates`.
+    """
+    def __init__(self, chunks: Sequence[DocChunk]):
+        cols = self._columns(chunks)
+        self.license = _Categorical(cols.pop("license"))
+        self.jurisdiction = _Categorical(cols.pop("jurisdiction"))
+        self.source_class = _Categorical(cols.pop("source_class"))
+        for name, arr in cols.items():
+            setattr(self, name, arr)
+        self.size = len(chunks)
+        self.version = 0  # bumped on every extend; part of the policy-decision cache key
+
+    @staticmethod
+    def _columns(chunks: Sequence[Optional[DocChunk]]) -> Dict:
+        if hasattr(chunks, "metadata_columns"):  # ChunkStore: already columnar
+            return chunks.metadata_columns()
+        metas = [c.metadata if c is not None else PolicyMetadata() for c in chunks]
+        n = len(metas)
+        created = [_parse_date(m.created_at) for m in metas]
+        return {
+            "license": [m.license for m in metas],
+            "jurisdiction": [m.jurisdiction or "unknown" for m in metas],
+            "source_class": [m.source_class for m in metas],
+            "contains_pii": np.fromiter((bool(m.contains_pii) for m in metas), dtype=bool, count=n),
+            "has_ttl": np.fromiter((m.ttl_days is not None for m in metas), dtype=bool, count=n),
+            "ttl_days": np.fromiter((m.ttl_days if m.ttl_days is not None else 0 for m in metas), dtype=np.int64, count=n),
+            "has_created": np.fromiter((d is not None for d in created), dtype=bool, count=n),
+            # proleptic Gregorian day ordinals; 0 where the date is missing/unparseable
+            "created_day": np.fromiter((d.toordinal() if d else 0 for d in created), dtype=np.int64, count=n),
+        }
+
+    def extend(self, chunks: Sequence[DocChunk]) -> None:
+        """Append rows for `chunks` (e.g. chunks added to an incremental index)."""
+        cols = self._columns(chunks)
+        self.license.extend(cols.pop("license"))
+        self.jurisdiction.extend(cols.pop("jurisdiction"))
+        self.source_class.extend(cols.pop("source_class"))
+        for name, arr in cols.items():
+            setattr(self, name, np.concatenate([getattr(self, name), arr]))
+        self.size += len(chunks)
+        self.version += 1
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(value)  # membership lists: order and duplicates do not matter
+    return value
+
+
+def directive_fingerprint(directive: RetrievalDirective) -> Tuple:
+    """Hashable key of every policy-relevant field of `directive` (all but the free-form `log`)."""
+    return tuple((f.name, _freeze(getattr(directive, f.name))) for f in fields(directive) if f.name != "log")
+
+
 @dataclass
 class PolicyRule:
-    """A policy predicate over PolicyMetadata. If predicate returns False, the chunk is inadmissible."""
+    """A policy predicate over PolicyMetadata. If predicate returns False, the chunk is inadmissible.
+
+    `vectorized`, when given, computes the same predicate for a whole corpus from PolicyColumns
+    (True = passes). Rules without it are evaluated row by row.
+    """
     name: str
     predicate: Callable[[PolicyMetadata, RetrievalDirective], bool]
+    vectorized: Optional[Callable[[PolicyColumns, RetrievalDirective], np.ndarray]] = None
 
 
 class PolicyEngine:
     """Policy-Aware Retrieval (PAR): profile query + filter inadmissible evidence BEFORE leasing."""
-    def __init__(self, rules: Optional[List[PolicyRule]] = None):
+    def __init__(self, rules: Optional[List[PolicyRule]] = None, cache_size: int = 64):
+        """`cache_size`: LRU entries of admissibility decisions per distinct directive; 0 disables.
+
+        Decisions are cached only when `columns` is passed, and are dropped when the corpus
+        (columns version or candidate mask) or the date changes.
+        """
         self.rules = rules or self._default_rules()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, Tuple[np.ndarray, Dict]]" = OrderedDict()
+        self._cache_scope: Optional[tuple] = None
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def cache_info(self) -> Dict[str, float]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "size": len(self._cache),
+            "maxsize": self.cache_size,
+        }
+
+    def cache_clear(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
 
     def profile_query(
         self,
@@ -66,19 +196,106 @@ class PolicyEngine:
                 reasons[rule.name] = "blocked"
         return (len(reasons) == 0), reasons
 
-    def filter_admissible(self, chunks: List[DocChunk], directive: RetrievalDirective) -> Tuple[List[DocChunk], Dict]:
-        kept, rejected = [], []
-        for c in chunks:
-            ok, reasons = self.is_admissible(c, directive)
-            if ok:
-                kept.append(c)
+    def admissible_mask(
+        self,
+        chunks: Sequence[DocChunk],
+        directive: RetrievalDirective,
+        columns: Optional[PolicyColumns] = None,
+        candidates: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, Dict]:
+        """Boolean mask over `chunks` (True = admissible) plus the PAR log.
+
+        Pass `columns` built once for `chunks` to avoid re-extracting metadata on every call
+        (and to enable the decision cache). Rows outside the `candidates` mask (e.g. deleted
+        chunks) are neither kept nor rejected.
+        """
+        if columns is None or self.cache_size <= 0:
+            return self._admissible_mask(chunks, directive, columns, candidates)
+
+        # scope: anything that invalidates every cached decision at once
+        live = b"" if candidates is None else hashlib.blake2b(np.packbits(candidates).tobytes(), digest_size=16).digest()
+        scope = (id(columns), columns.version, len(chunks), live, _dt.date.today().toordinal(), tuple(map(id, self.rules)))
+        key = directive_fingerprint(directive)
+        with self._cache_lock:
+            if scope != self._cache_scope:
+                self._cache.clear()
+                self._cache_scope = scope
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
             else:
-                rejected.append({"doc_id": c.doc_id, "chunk_id": c.chunk_id, "reasons": reasons})
+                self.cache_misses += 1
+        if hit is None:
+            hit = self._admissible_mask(chunks, directive, columns, candidates)
+            with self._cache_lock:
+                if scope == self._cache_scope:
+                    self._cache[key] = hit
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        mask, log = hit
+        return mask.copy(), {**log, "rejected_details": list(log["rejected_details"])}
+
+    def _admissible_mask(
+        self,
+        chunks: Sequence[DocChunk],
+        directive: RetrievalDirective,
+        columns: Optional[PolicyColumns],
+        candidates: Optional[np.ndarray],
+    ) -> Tuple[np.ndarray, Dict]:
+        if columns is None:
+            columns = PolicyColumns(chunks)
+        n = len(chunks)
+        if candidates is None:  # removed chunks (None slots) are never admissible
+            candidates = np.fromiter((c is not None for c in chunks), dtype=bool, count=n)
+        mask = candidates.copy()
+        n_candidates = int(mask.sum())
+        passed: Dict[str, np.ndarray] = {}
+        rowwise = []
+        for rule in self.rules:
+            if rule.vectorized is None:
+                rowwise.append(rule)
+                continue
+            passed[rule.name] = rule.vectorized(columns, directive)
+            mask &= passed[rule.name]
+
+        # per-row fallback for custom rules, only over rows still admissible
+        for rule in rowwise:
+            ok = np.ones(n, dtype=bool)
+            for i in np.flatnonzero(mask):
+                ok[i] = bool(rule.predicate(chunks[i].metadata, directive))
+            passed[rule.name] = ok
+            mask &= ok
+
+        rejected_rows = np.flatnonzero(candidates & ~mask)
+        details = []
+        for i in rejected_rows[:50]:  # cap
+            c = chunks[i]
+            reasons: Dict[str, str] = {}
+            for rule in self.rules:
+                if rule.vectorized is None:
+                    ok = rule.predicate(c.metadata, directive)  # may have been skipped above
+                else:
+                    ok = passed[rule.name][i]
+                if not ok:
+                    reasons[rule.name] = "blocked"
+            details.append({"doc_id": c.doc_id, "chunk_id": c.chunk_id, "reasons": reasons})
         log = {
-            "kept": len(kept),
-            "rejected": len(rejected),
-            "rejected_details": rejected[:50],  # cap
+            "kept": n_candidates - len(rejected_rows),
+            "rejected": int(len(rejected_rows)),
+            "rejected_details": details,
         }
+        return mask, log
+
+    def filter_admissible(
+        self,
+        chunks: Sequence[DocChunk],
+        directive: RetrievalDirective,
+        columns: Optional[PolicyColumns] = None,
+        candidates: Optional[np.ndarray] = None,
+    ) -> Tuple[List[DocChunk], Dict]:
+        mask, log = self.admissible_mask(chunks, directive, columns=columns, candidates=candidates)
+        kept = [chunks[i] for i in np.flatnonzero(mask)]
         return kept, log
 
     @staticmethod
@@ -118,10 +335,41 @@ class PolicyEngine:
                 return True
             return meta.source_class in d.restrict_to_source_classes
 
+        def license_mask(cols: PolicyColumns, d: RetrievalDirective) -> np.ndarray:
+            if d.allowed_licenses is None:
+                return np.ones(cols.size, dtype=bool)
+            return cols.license.isin(d.allowed_licenses)
+
+        def jurisdiction_mask(cols: PolicyColumns, d: RetrievalDirective) -> np.ndarray:
+            if d.allowed_jurisdictions is None:
+                return np.ones(cols.size, dtype=bool)
+            return cols.jurisdiction.isin(d.allowed_jurisdictions)
+
+        def pii_mask(cols: PolicyColumns, d: RetrievalDirective) -> np.ndarray:
+            if not d.forbid_pii:
+                return np.ones(cols.size, dtype=bool)
+            return ~cols.contains_pii
+
+        def stale_mask(cols: PolicyColumns, d: RetrievalDirective) -> np.ndarray:
+            if not d.exclude_stale:
+                return np.ones(cols.size, dtype=bool)
+            if d.max_ttl_days is not None:
+                has_ttl = np.ones(cols.size, dtype=bool)
+                ttl = np.full(cols.size, d.max_ttl_days, dtype=np.int64)
+            else:
+                has_ttl, ttl = cols.has_ttl, cols.ttl_days
+            age_days = _dt.date.today().toordinal() - cols.created_day
+            return ~has_ttl | ~cols.has_created | (age_days <= ttl)
+
+        def source_class_mask(cols: PolicyColumns, d: RetrievalDirective) -> np.ndarray:
+            if not d.restrict_to_source_classes:
+                return np.ones(cols.size, dtype=bool)
+            return cols.source_class.isin(d.restrict_to_source_classes)
+
         return [
-            PolicyRule("license", license_rule),
-            PolicyRule("jurisdiction", jurisdiction_rule),
-            PolicyRule("pii", pii_rule),
-            PolicyRule("staleness_ttl", stale_rule),
-            PolicyRule("source_class", source_class_rule),
+            PolicyRule("license", license_rule, license_mask),
+            PolicyRule("jurisdiction", jurisdiction_rule, jurisdiction_mask),
+            PolicyRule("pii", pii_rule, pii_mask),
+            PolicyRule("staleness_ttl", stale_rule, stale_mask),
+            PolicyRule("source_class", source_class_rule, source_class_mask),
         ]
@@ -1,13 +1,205 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Sequence
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, Union
 
 import numpy as np
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 
-from .types import DocChunk
+from .store import ChunkKeys, ChunkStore
+from .types import DocChunk, PolicyMetadata
+
+# Admissibility restriction for a search: a boolean mask aligned with the retriever's `chunks`
+# (i.e. indexed by doc number), or a set of (doc_id, chunk_id) keys. None means every chunk is admissible.
+Admissible = Union[np.ndarray, Collection[Tuple[str, str]], None]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the `k` largest scores in descending order, ties broken by lower index.
+
+    Selection is O(n) via argpartition; only the selected k are sorted.
+    """
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - len(above)]
+        idx = np.concatenate([above, ties])
+    else:
+        idx = np.arange(n)
+    return idx[np.lexsort((idx, -scores[idx]))]
+
+
+def resolve_admissible(admissible: Admissible, n: int, docno_of: Dict[Tuple[str, str], int]) -> Optional[np.ndarray]:
+    """Boolean mask over `n` doc numbers allowed by `admissible`, or None when unrestricted."""
+    if admissible is None:
+        return None
+    if isinstance(admissible, np.ndarray) and admissible.dtype == bool:
+        if admissible.shape[0] > n or admissible.ndim != 1:
+            raise ValueError(f"admissible mask has shape {admissible.shape}, expected ({n},)")
+        if admissible.shape[0] < n:  # chunks added after the mask was computed are not admissible
+            admissible = np.concatenate([admissible, np.zeros(n - admissible.shape[0], dtype=bool)])
+        return admissible
+    mask = np.zeros(n, dtype=bool)
+    for key in admissible:
+        i = docno_of.get(tuple(key))
+        if i is not None:
+            mask[i] = True
+    return mask
+
+
+def iter_top_k(scores: np.ndarray, top_k: int, block_size: int) -> Iterator[np.ndarray]:
+    """Positions of the `top_k` best `scores` (same order as `top_k_indices`), selected `block_size` at a time."""
+    remaining = np.arange(scores.shape[0])
+    emitted = 0
+    while emitted < top_k and len(remaining):
+        sel = top_k_indices(scores[remaining], min(block_size, top_k - emitted))
+        yield remaining[sel]
+        emitted += len(sel)
+        remaining = np.delete(remaining, sel)
+
+
+def own_chunks(chunks: Sequence[DocChunk]) -> List[Optional[DocChunk]]:
+    """The doc-number-indexed chunk list a retriever keeps: a ChunkStore is taken over as is (appended
+    to in place; removals swap in copies sharing its columns), anything else is copied into a list."""
+    return chunks if isinstance(chunks, ChunkStore) else list(chunks)
+
+
+def tombstoned(
+    chunks: Sequence[Optional[DocChunk]], live: np.ndarray, docno_of, keys: Iterable[Tuple[str, str]]
+) -> Tuple[Sequence[Optional[DocChunk]], np.ndarray, int]:
+    """Copy-on-write removal: (chunks, live, number removed) with the rows of `keys` tombstoned and
+    popped from `docno_of`. The `chunks` and `live` passed in are left as they were, so a search
+    that read them before the removal still sees a consistent snapshot; callers swap in the copies.
+    """
+    docnos = [i for i in (docno_of.pop(tuple(key), None) for key in keys) if i is not None]
+    if not docnos:
+        return chunks, live, 0
+    live = live.copy()
+    live[docnos] = False
+    if isinstance(chunks, ChunkStore):
+        chunks = chunks.without(docnos)
+    else:
+        chunks = list(chunks)
+        for i in docnos:
+            chunks[i] = None
+    return chunks, live, len(docnos)
+
+
+def live_chunks(retriever: "Retriever") -> List[DocChunk]:
+    """The chunks `retriever` currently searches, in doc-number order (tombstones skipped)."""
+    return [c for c in retriever.chunks if c is not None]
+
+
+def present_results(chunks: Sequence[Optional[DocChunk]], docnos: Iterable[int], scores: Iterable[float]) -> List[RetrievalResult]:
+    """Results for `docnos` (live doc numbers of the snapshot `chunks`) in order."""
+    return [RetrievalResult(chunk=chunks[d], score=float(s)) for d, s in zip(docnos, scores)]
+
+
+def docno_index(chunks: Sequence[Optional[DocChunk]]) -> Union[Dict[Tuple[str, str], int], ChunkKeys]:
+    """(doc_id, chunk_id) -> doc number; over a ChunkStore, looked up through its key column
+    instead of a dict with one entry per row."""
+    if isinstance(chunks, ChunkStore):
+        return ChunkKeys(chunks)
+    return {(c.doc_id, c.chunk_id): i for i, c in enumerate(chunks) if c is not None}
+
+
+def chunk_to_record(chunk: DocChunk) -> dict:
+    return {"doc_id": chunk.doc_id, "chunk_id": chunk.chunk_id, "text": chunk.text, "metadata": asdict(chunk.metadata)}
+
+
+def chunk_from_record(rec: dict) -> DocChunk:
+    return DocChunk(doc_id=rec["doc_id"], chunk_id=rec["chunk_id"], text=rec["text"], metadata=PolicyMetadata(**rec["metadata"]))
+
+
+def maxscore_top_k(
+    q: sp.csr_matrix,
+    mat: sp.csr_matrix,
+    postings: sp.csc_matrix,
+    col_max: np.ndarray,
+    k: int,
+    allowed: Optional[np.ndarray] = None,
+    eps: float = 1e-9,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(rows, scores) of the `k` best rows of `q @ mat.T` among `allowed`, ranked as `top_k_indices` ranks them.
+
+    Term-at-a-time MaxScore over `postings` (the CSC view of `mat`; `col_max` is each term's largest
+    weight): query terms are added in order of their score bound `weight * col_max`. Once the
+    bound of the remaining terms plus `eps` is below the k-th best partial score, no unseen row
+    can make the top k and their postings are not read. Candidates are rescored exactly, and if
+    fewer than `k` allowed rows share a term with the query the rest are zero-score rows, lowest first.
+    """
+    n = mat.shape[0]
+    k = min(k, n if allowed is None else int(np.count_nonzero(allowed)))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    terms, weights = q.indices, q.data
+    bounds = weights * col_max[terms]
+    order = np.argsort(-bounds, kind="stable")
+    rest = np.cumsum(bounds[order][::-1])[::-1]  # rest[j]: bound on what terms order[j:] can add
+
+    cand = np.empty(0, dtype=np.int64)
+    partial = np.empty(0)
+    theta = None  # k-th best partial score: a lower bound on the k-th best score
+    for j, ti in enumerate(order):
+        if theta is not None and rest[j] + eps < theta:
+            break
+        t = terms[ti]
+        lo, hi = postings.indptr[t], postings.indptr[t + 1]
+        rows, vals = postings.indices[lo:hi], postings.data[lo:hi] * weights[ti]
+        if allowed is not None:
+            keep = allowed[rows]
+            rows, vals = rows[keep], vals[keep]
+        cand, inv = np.unique(np.concatenate([cand, rows]), return_inverse=True)
+        partial = np.bincount(inv, weights=np.concatenate([partial, vals]), minlength=len(cand))
+        if len(cand) >= k:
+            theta = np.partition(partial, len(cand) - k)[len(cand) - k]
+
+    scores = np.empty(0)
+    if len(cand):
+        # the query's columns of the candidate rows, summed in term order like the full `q @ mat.T`
+        sub = mat[cand][:, terms]
+        sub.sort_indices()
+        scores = sub @ weights
+    sel = top_k_indices(scores, k)  # cand ascends, so ties go to the lower row
+    rows, scores = cand[sel], scores[sel]
+    if len(rows) < k:
+        fill = []
+        need = k - len(rows)
+        for lo in range(0, n, 65536):
+            block = np.arange(lo, min(n, lo + 65536))
+            if allowed is not None:
+                block = block[allowed[lo: lo + 65536]]
+            block = block[~np.isin(block, cand)][:need]
+            fill.append(block)
+            need -= len(block)
+            if not need:
+                break
+        fill = np.concatenate(fill)
+        rows = np.concatenate([rows, fill])
+        scores = np.concatenate([scores, np.zeros(len(fill))])
+    return rows, scores
+
+
+@dataclass(frozen=True, eq=False)
+class _Segment:
+    """An immutable slice of the index: TF-IDF rows plus the doc numbers they belong to (ascending)."""
+    mat: sp.csr_matrix
+    docnos: np.ndarray
+
+    @cached_property
+    def postings(self) -> Tuple[sp.csc_matrix, np.ndarray]:
+        """CSC view of `mat` and each term's largest weight, built on first use (an in-memory copy)."""
+        csc = self.mat.tocsc()
+        return csc, csc.max(axis=0).toarray().ravel()
 
 
 @dataclass
@@ -16,19 +208,304 @@ class RetrievalResult:
     score: float
 
 
+class Retriever(Protocol):
+    """Retrieval backend interface used by BELRAGPipeline.
+
+    `chunks` is indexed by doc number (None for removed chunks), `live` flags the doc numbers that
+    are searchable, and admissibility masks are aligned with both. Backends that support
+    incremental indexing also provide `add_chunks`, `update_chunk` and `remove_chunks`; removals
+    replace `chunks` and `live` with updated copies rather than writing into them, so a search
+    keeps the pair it read. `live_chunks(retriever)` lists the searchable chunks only.
+    """
+    chunks: List[Optional[DocChunk]]
+    live: np.ndarray
+
+    def search(self, query: str, top_k: int = 10, admissible: Admissible = None) -> List[RetrievalResult]: ...
+
+    def search_batch(
+        self, queries: Sequence[str], top_k: int = 10, admissible: Optional[Sequence[Admissible]] = None
+    ) -> List[List[RetrievalResult]]: ...
+
+    def iter_search(
+        self, query: str, top_k: int = 10, admissible: Admissible = None, block_size: int = 8
+    ) -> Iterator[RetrievalResult]: ...
+
+
 class TfidfRetriever:
-    """Simple vector retrieval backend (TF-IDF cosine). Replace with dense embeddings in production."""
-    def __init__(self, chunks: Sequence[DocChunk], ngram_range=(1, 2), max_features: int = 50000):
-        self.chunks = list(chunks)
+    """Simple vector retrieval backend (TF-IDF cosine). Replace with dense embeddings in production.
+
+    Chunks are addressed by doc number: their position in `chunks`, assigned on insertion and never
+    reused. The index is a list of segments; `add_chunks` appends a delta segment vectorized with
+    the frozen vocabulary/IDF, removals only tombstone (the slot in `chunks` becomes None, in a
+    copy of `chunks` and `live` swapped in under the lock), and `compact` merges all segments into
+    one, dropping tombstoned rows.
+
+    `scoring="maxscore"` ranks with `maxscore_top_k` over per-segment postings instead of scoring
+    every row; results are the same.
+    """
+    _SCORING = ("exhaustive", "maxscore")
+
+    def __init__(
+        self,
+        chunks: Sequence[DocChunk],
+        ngram_range=(1, 2),
+        max_features: int = 50000,
+        max_delta_segments: int = 8,
+        scoring: str = "exhaustive",
+    ):
         self.vectorizer = TfidfVectorizer(ngram_range=ngram_range, max_features=max_features, stop_words="english")
+        self.max_delta_segments = max_delta_segments
+        self.scoring = self._check_scoring(scoring)
+        self._lock = threading.RLock()
+        self._merge_thread: Optional[threading.Thread] = None
+        self._reset(own_chunks(chunks))
         self._fit()
 
+    @classmethod
+    def _check_scoring(cls, scoring: str) -> str:
+        if scoring not in cls._SCORING:
+            raise ValueError(f"scoring must be one of {cls._SCORING}, got {scoring!r}")
+        return scoring
+
+    def _reset(self, chunks: List[DocChunk]) -> None:
+        self.chunks: List[Optional[DocChunk]] = chunks
+        self.live = np.ones(len(chunks), dtype=bool)
+        self._docno_of = docno_index(chunks)
+        self._segments: Tuple[_Segment, ...] = ()
+        self.version = 0  # bumped on every add/remove; segment merges do not change it
+
     def _fit(self) -> None:
         texts = [c.text for c in self.chunks]
-        self.mat = self.vectorizer.fit_transform(texts)
+        mat = self.vectorizer.fit_transform(texts)
+        self._segments = (_Segment(mat.tocsr(), np.arange(len(self.chunks), dtype=np.int64)),)
+
+    # ---- incremental updates ----
+
+    def add_chunks(self, chunks: Sequence[DocChunk]) -> np.ndarray:
+        """Index `chunks` as a new delta segment; returns their doc numbers. Existing keys are replaced."""
+        chunks = list(chunks)
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        mat = self.vectorizer.transform([c.text for c in chunks]).tocsr()
+        with self._lock:
+            self._tombstone([(c.doc_id, c.chunk_id) for c in chunks])
+            start = len(self.chunks)
+            docnos = np.arange(start, start + len(chunks), dtype=np.int64)
+            self.chunks.extend(chunks)
+            self.live = np.concatenate([self.live, np.ones(len(chunks), dtype=bool)])
+            for i, c in zip(docnos, chunks):
+                self._docno_of[(c.doc_id, c.chunk_id)] = int(i)
+            self._segments = self._segments + (_Segment(mat, docnos),)
+            self.version += 1
+            if len(self._segments) > self.max_delta_segments + 1:
+                self.compact(background=True)
+        return docnos
+
+    def update_chunk(self, chunk: DocChunk) -> int:
+        """Replace the chunk with the same (doc_id, chunk_id), or add it; returns its new doc number."""
+        return int(self.add_chunks([chunk])[0])
+
+    def remove_chunks(self, keys: Iterable[Tuple[str, str]]) -> int:
+        """Tombstone chunks by (doc_id, chunk_id); returns how many were live."""
+        with self._lock:
+            n = self._tombstone(keys)
+            if n:
+                self.version += 1
+        return n
+
+    def _tombstone(self, keys: Iterable[Tuple[str, str]]) -> int:
+        self.chunks, self.live, n = tombstoned(self.chunks, self.live, self._docno_of, keys)
+        return n
+
+    def compact(self, background: bool = False) -> None:
+        """Merge all segments into one, dropping tombstoned rows. Searches keep running on the old
+        segments until the merged one is swapped in."""
+        if background:
+            with self._lock:
+                if self._merge_thread is not None and self._merge_thread.is_alive():
+                    return
+                self._merge_thread = threading.Thread(target=self.compact, name="tfidf-compact", daemon=True)
+                self._merge_thread.start()
+            return
+        with self._lock:
+            segments, live = self._segments, self.live
+        if len(segments) == 1 and live[segments[0].docnos].all():
+            return
+        merged = self._merged(segments, live)
+        with self._lock:
+            # rows tombstoned meanwhile stay filtered by `live`; keep delta segments appended meanwhile
+            if self._segments[: len(segments)] == segments:
+                self._segments = (merged,) + self._segments[len(segments):]
+
+    @staticmethod
+    def _merged(segments: Tuple[_Segment, ...], live: np.ndarray) -> _Segment:
+        mats, docnos = [], []
+        for seg in segments:
+            keep = live[seg.docnos]
+            mats.append(seg.mat[keep] if not keep.all() else seg.mat)
+            docnos.append(seg.docnos[keep])
+        return _Segment(sp.vstack(mats, format="csr"), np.concatenate(docnos))
+
+    def wait_for_compaction(self) -> None:
+        thread = self._merge_thread
+        if thread is not None:
+            thread.join()
+
+    # ---- persistence ----
+
+    _INDEX_FORMAT = 1
+    _ARRAYS = ("data", "indices", "indptr")
+
+    def save(self, path: str) -> None:
+        """Write the live index to directory `path`: vocabulary/IDF, CSR arrays as .npy, chunks as
+        JSONL and as a `ChunkStore` (under `store/`, opened by `load(chunk_store=True)`).
+
+        Tombstoned chunks are dropped, so doc numbers are renumbered densely in the saved index.
+        """
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            merged = self._merged(self._segments, self.live)
+            chunks = [self.chunks[i] for i in merged.docnos]
+        mat = merged.mat
+        for name in self._ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(getattr(mat, name)))
+        np.save(os.path.join(path, "idf.npy"), self.vectorizer.idf_)
+        meta = {
+            "format": self._INDEX_FORMAT,
+            "shape": list(mat.shape),
+            "ngram_range": list(self.vectorizer.ngram_range),
+            "max_features": self.vectorizer.max_features,
+            "max_delta_segments": self.max_delta_segments,
+            "vocabulary": {t: int(i) for t, i in self.vectorizer.vocabulary_.items()},
+        }
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        with open(os.path.join(path, "chunks.jsonl"), "w", encoding="utf-8") as f:
+            for c in chunks:
+                f.write(json.dumps(chunk_to_record(c)) + "\n")
+        ChunkStore(chunks).save(os.path.join(path, "store"))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, chunk_store: bool = False, scoring: str = "exhaustive") -> "TfidfRetriever":
+        """Load an index written by `save`. With `mmap`, the CSR arrays are memory-mapped read-only,
+        so processes loading the same index share its pages. With `chunk_store`, chunks are kept
+        in a compact `ChunkStore` instead of a list of `DocChunk`s; the saved store is opened
+        memory-mapped (shared like the CSR arrays), or built from chunks.jsonl for older indexes."""
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != cls._INDEX_FORMAT:
+            raise ValueError(f"unsupported index format {meta.get('format')!r} at {path}")
+        mode = "r" if mmap else None
+        data, indices, indptr = (np.load(os.path.join(path, f"{n}.npy"), mmap_mode=mode) for n in cls._ARRAYS)
+
+        self = cls.__new__(cls)
+        self.vectorizer = TfidfVectorizer(
+            ngram_range=tuple(meta["ngram_range"]),
+            max_features=meta["max_features"],
+            stop_words="english",
+            vocabulary=meta["vocabulary"],
+        )
+        self.vectorizer.idf_ = np.load(os.path.join(path, "idf.npy"))
+        self.max_delta_segments = meta.get("max_delta_segments", 8)
+        self.scoring = cls._check_scoring(scoring)
+        self._lock = threading.RLock()
+        self._merge_thread = None
+        store_path = os.path.join(path, "store")
+        if chunk_store and os.path.isdir(store_path):
+            self._reset(ChunkStore.open(store_path))
+        else:
+            with open(os.path.join(path, "chunks.jsonl"), encoding="utf-8") as f:
+                records = (chunk_from_record(json.loads(line)) for line in f)
+                self._reset(ChunkStore(records) if chunk_store else list(records))
+        mat = sp.csr_matrix((data, indices, indptr), shape=tuple(meta["shape"]), copy=False)
+        self._segments = (_Segment(mat, np.arange(len(self.chunks), dtype=np.int64)),)
+        return self
+
+    # ---- search ----
+
+    def _admissible_rows(self, admissible: Admissible) -> Optional[np.ndarray]:
+        return resolve_admissible(admissible, len(self.live), self._docno_of)
+
+    def search(self, query: str, top_k: int = 10, admissible: Admissible = None) -> List[RetrievalResult]:
+        """Rank chunks against `query`; only rows allowed by `admissible` are returned (IDF stays corpus-wide)."""
+        return self.search_batch([query], top_k=top_k, admissible=[admissible])[0]
+
+    def iter_search(
+        self,
+        query: str,
+        top_k: int = 10,
+        admissible: Admissible = None,
+        block_size: int = 8,
+    ) -> Iterator[RetrievalResult]:
+        """Yield the same results as `search`, in score order, selecting and materializing them
+        `block_size` at a time; a consumer that stops early skips the ranking of later blocks."""
+        if self.scoring == "maxscore":
+            (ranked,), chunks = self._maxscore([query], top_k, [admissible])
+            for docno, score in zip(*ranked):
+                yield RetrievalResult(chunk=chunks[docno], score=float(score))
+            return
+        sims_all, docnos, row_live, chunks = self._score([query])
+        sims = sims_all[0].toarray().ravel()
+        rows = self._allowed_rows(row_live, docnos, admissible)
+        for block in iter_top_k(sims[rows], top_k, block_size):
+            for i in rows[block]:
+                yield RetrievalResult(chunk=chunks[docnos[i]], score=float(sims[i]))
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 10,
+        admissible: Optional[Sequence[Admissible]] = None,
+    ) -> List[List[RetrievalResult]]:
+        """Rank chunks for many queries with one sparse product; `admissible` holds one spec per query."""
+        if admissible is not None and len(admissible) != len(queries):
+            raise ValueError(f"got {len(admissible)} admissible specs for {len(queries)} queries")
+        if not queries:
+            return []
+        if self.scoring == "maxscore":
+            ranked, chunks = self._maxscore(queries, top_k, admissible or [None] * len(queries))
+            return [present_results(chunks, docnos, scores) for docnos, scores in ranked]
+        sims_all, docnos, row_live, chunks = self._score(queries)
+        out = []
+        for qi in range(len(queries)):
+            sims = sims_all[qi].toarray().ravel()
+            rows = self._allowed_rows(row_live, docnos, admissible[qi] if admissible is not None else None)
+            idx = rows[top_k_indices(sims[rows], top_k)]
+            out.append(present_results(chunks, docnos[idx], sims[idx]))
+        return out
+
+    def _score(self, queries: Sequence[str]):
+        """Cosine of every query against every segment row, plus the row -> doc number map."""
+        with self._lock:
+            segments, live, chunks = self._segments, self.live, self.chunks
+        q = self.vectorizer.transform(queries)
+        # rows of both matrices are L2-normalised by the vectorizer, so the dot product is the cosine
+        sims_all = sp.hstack([q @ seg.mat.T for seg in segments], format="csr")
+        docnos = np.concatenate([seg.docnos for seg in segments])
+        return sims_all, docnos, live[docnos], chunks
+
+    def _maxscore(self, queries: Sequence[str], top_k: int, admissible: Sequence[Admissible]):
+        """Per query (doc numbers, scores) of the top k, merged across segments by score then doc number."""
+        with self._lock:
+            segments, live, chunks = self._segments, self.live, self.chunks
+        q = self.vectorizer.transform(queries).tocsr()
+        out = []
+        for qi, spec in enumerate(admissible):
+            mask = self._admissible_rows(spec)
+            allowed = live if mask is None else live & mask
+            parts = []
+            for seg in segments:
+                row_allowed = allowed[seg.docnos]
+                rows, scores = maxscore_top_k(
+                    q[qi], seg.mat, *seg.postings, top_k, None if row_allowed.all() else row_allowed
+                )
+                parts.append((seg.docnos[rows], scores))
+            docnos = np.concatenate([p[0] for p in parts])
+            scores = np.concatenate([p[1] for p in parts])
+            best = np.lexsort((docnos, -scores))[:top_k]
+            out.append((docnos[best], scores[best]))
+        return out, chunks
 
-    def search(self, query: str, top_k: int = 10) -> List[RetrievalResult]:
-        q = self.vectorizer.transform([query])
-        sims = cosine_similarity(q, self.mat).ravel()
-        idx = np.argsort(-sims)[:top_k]
-        return [RetrievalResult(chunk=self.chunks[i], score=float(sims[i])) for i in idx]
+    def _allowed_rows(self, row_live: np.ndarray, docnos: np.ndarray, admissible: Admissible) -> np.ndarray:
+        mask = self._admissible_rows(admissible)
+        return np.flatnonzero(row_live if mask is None else row_live & mask[docnos])
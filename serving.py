@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from .types import BELRAGOutput
+
+if TYPE_CHECKING:
+    from .pipeline import BELRAGPipeline
+
+
+@dataclass
+class ServingConfig:
+    batch_window_ms: float = 2.0   # how long the first query of a micro-batch waits for others
+    max_batch_size: int = 32
+    max_inflight_batches: int = 2  # batches executing at once (and default executor threads)
+    max_queued: int = 1024         # queries waiting for a batch; arun() blocks when full (backpressure)
+    coalesce: bool = True          # identical in-flight queries share one computation
+
+
+# (query, future, enqueue time)
+_Pending = Tuple[str, "asyncio.Future[BELRAGOutput]", float]
+
+
+class AsyncPipeline:
+    """asyncio front-end for BELRAGPipeline.
+
+    Concurrent `run` calls are gathered into micro-batches (up to `max_batch_size` queries or
+    `batch_window_ms` after the first one) and answered by `pipeline.run_many` on an executor,
+    so the event loop never runs retrieval or auditing. At most `max_inflight_batches` batches
+    execute at once; beyond that queries wait in a queue of `max_queued`, and `run` waits for
+    room. Identical in-flight queries are coalesced: their callers receive the same output object.
+
+    The default executor is a thread pool: the pipeline holds locks and the index in memory, so it
+    is not shipped to other processes (use `ShardedRetriever` for multi-process retrieval).
+    """
+    def __init__(self, pipeline: "BELRAGPipeline", cfg: Optional[ServingConfig] = None, executor: Optional[Executor] = None):
+        self.pipeline = pipeline
+        self.cfg = cfg or ServingConfig()
+        self._own_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=self.cfg.max_inflight_batches, thread_name_prefix="belrag-batch"
+        )
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._collecting: List[_Pending] = []  # batch being gathered by the batch loop
+        self.closed = False
+        self.stats = {"queries": 0, "coalesced": 0, "batches": 0}
+
+    def _start(self) -> None:
+        # queue/semaphore are created inside the running loop (Python 3.9 binds them at construction)
+        self.loop = asyncio.get_running_loop()
+        self._queue: "asyncio.Queue[_Pending]" = asyncio.Queue(maxsize=self.cfg.max_queued)
+        self._slots = asyncio.Semaphore(self.cfg.max_inflight_batches)
+        self._worker = self.loop.create_task(self._batch_loop())
+
+    async def run(self, query: str) -> BELRAGOutput:
+        if self.closed:
+            raise RuntimeError("AsyncPipeline is closed")
+        if self._worker is None:
+            self._start()
+        self.stats["queries"] += 1
+        fut = self._inflight.get(query) if self.cfg.coalesce else None
+        if fut is not None:
+            self.stats["coalesced"] += 1
+        else:
+            fut = self.loop.create_future()
+            if self.cfg.coalesce:
+                self._inflight[query] = fut
+            try:
+                await self._queue.put((query, fut, time.perf_counter()))
+            except BaseException:
+                # cancelled while waiting for queue space: the query was never enqueued
+                self._forget(query, fut)
+                fut.cancel()
+                raise
+        # a cancelled caller must not cancel the computation other callers share
+        return await asyncio.shield(fut)
+
+    def _forget(self, query: str, fut: asyncio.Future) -> None:
+        if self._inflight.get(query) is fut:
+            del self._inflight[query]
+
+    async def _batch_loop(self) -> None:
+        while True:
+            batch = self._collecting = [await self._queue.get()]
+            deadline = self.loop.time() + self.cfg.batch_window_ms / 1e3
+            while len(batch) < self.cfg.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                # asyncio.wait (not wait_for): a getter cancelled on timeout leaves its item queued
+                getter = self.loop.create_task(self._queue.get())
+                done, _ = await asyncio.wait({getter}, timeout=timeout)
+                if not done:
+                    getter.cancel()
+                    break
+                batch.append(getter.result())
+            self._collecting = []
+            batch = [p for p in batch if not p[1].done()]
+            if not batch:
+                continue
+            await self._slots.acquire()  # backpressure: stop draining the queue while all slots are busy
+            task = self.loop.create_task(self._execute(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _execute(self, batch: List[_Pending]) -> None:
+        queries = [q for q, _, _ in batch]
+        started = time.perf_counter()
+        self.stats["batches"] += 1
+        try:
+            outs = await self.loop.run_in_executor(self.executor, self.pipeline.run_many, queries)
+        except Exception as e:
+            for q, fut, _ in batch:
+                self._forget(q, fut)
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for (q, fut, enqueued), out in zip(batch, outs):
+            self._forget(q, fut)
+            out.debug["serving"] = {"batch_size": len(batch), "queue_ms": (started - enqueued) * 1e3}
+            if not fut.done():
+                fut.set_result(out)
+
+    async def close(self) -> None:
+        """Stop batching, let running batches finish, and shut down the default executor.
+        Queries still queued are cancelled."""
+        self.closed = True
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        for _, fut, _ in self._collecting + self._drain():
+            fut.cancel()
+        if self._own_executor:
+            self.executor.shutdown(wait=True)
+
+    def abandon(self) -> None:
+        """Release a front-end whose event loop has closed, taking its tasks with it: mark it closed
+        and shut down the default executor without waiting."""
+        self.closed = True
+        self._worker = None
+        self._batches.clear()
+        if self._own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _drain(self) -> List[_Pending]:
+        pending = []
+        while self.loop is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        return pending
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from .retrieval import Admissible, RetrievalResult, TfidfRetriever, present_results, resolve_admissible, tombstoned, top_k_indices
+from .types import DocChunk
+
+# Worker-process state: the one shard this process serves (each shard has its own single-worker pool).
+_SHARD: Dict[str, object] = {}
+
+
+def _init_shard(mat: sp.csr_matrix, docnos: np.ndarray) -> None:
+    _SHARD["mat"] = mat
+    _SHARD["docnos"] = docnos
+
+
+def _shard_size() -> int:
+    return _SHARD["mat"].shape[0]
+
+
+def _shard_add(mat: sp.csr_matrix, docnos: np.ndarray) -> int:
+    _SHARD["mat"] = sp.vstack([_SHARD["mat"], mat], format="csr")
+    _SHARD["docnos"] = np.concatenate([_SHARD["docnos"], docnos])
+    return _SHARD["mat"].shape[0]
+
+
+def _shard_top_k(q: sp.csr_matrix, masks: Sequence[Optional[np.ndarray]], top_k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Local top-k per query: (global doc numbers, scores), score-descending, ties by doc number.
+
+    `masks[i]` is a packed bit mask over this shard's rows, or None for every row.
+    """
+    mat, docnos = _SHARD["mat"], _SHARD["docnos"]
+    sims_all = (q @ mat.T).tocsr()
+    out = []
+    for qi, packed in enumerate(masks):
+        sims = sims_all[qi].toarray().ravel()
+        if packed is None:
+            rows = np.arange(len(docnos))
+        else:
+            rows = np.flatnonzero(np.unpackbits(packed, count=len(docnos)).view(bool))
+        cand = rows[top_k_indices(sims[rows], top_k)]  # docnos ascend within a shard: ties by doc number
+        out.append((docnos[cand], sims[cand]))
+    return out
+
+
+class ShardedRetriever:
+    """TF-IDF retrieval split across `n_shards` worker processes, one contiguous doc-number range each.
+
+    The vectorizer (vocabulary and IDF) is fitted once over the whole corpus, so scores and results
+    are identical to `TfidfRetriever`. Queries are vectorized here and fanned out to all shards with
+    their slice of each admissibility mask; the per-shard top-k lists are merged by score, ties
+    broken by lower doc number. Call `close()` (or use as a context manager) to stop the workers.
+    """
+    def __init__(self, chunks: Sequence[DocChunk], n_shards: int = 4, ngram_range=(1, 2), max_features: int = 50000):
+        base = TfidfRetriever(chunks, ngram_range=ngram_range, max_features=max_features)
+        self._init_from(base, n_shards)
+
+    @classmethod
+    def from_retriever(cls, base: TfidfRetriever, n_shards: int = 4) -> "ShardedRetriever":
+        """Shard an existing (e.g. loaded) TF-IDF index. The shards take over its chunk bookkeeping,
+        so `base` should not be used afterwards."""
+        self = cls.__new__(cls)
+        self._init_from(base, n_shards)
+        return self
+
+    def _init_from(self, base: TfidfRetriever, n_shards: int) -> None:
+        base.wait_for_compaction()
+        with base._lock:
+            seg = base._merged(base._segments, base.live)
+            self.chunks: List[Optional[DocChunk]] = base.chunks
+            self.live = base.live
+            self._docno_of = base._docno_of
+            self.version = base.version
+        self.vectorizer = base.vectorizer
+        self._lock = threading.RLock()
+        bounds = np.linspace(0, seg.mat.shape[0], max(1, n_shards) + 1).astype(int)
+        self._pools: List[ProcessPoolExecutor] = []
+        self._shard_rows: List[int] = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            self._pools.append(ProcessPoolExecutor(max_workers=1, initializer=_init_shard, initargs=(seg.mat[lo:hi], seg.docnos[lo:hi])))
+            self._shard_rows.append(int(hi - lo))
+        # per shard: the doc numbers it holds, to slice masks (kept here; the matrix rows are not)
+        self._shard_docnos = [seg.docnos[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        for pool in self._pools:  # start the workers now rather than on the first query
+            pool.submit(_shard_size).result()
+
+    @property
+    def n_shards(self) -> int:
+        return len(self._pools)
+
+    def close(self) -> None:
+        for pool in self._pools:
+            pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ShardedRetriever":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- incremental updates ----
+
+    def add_chunks(self, chunks: Sequence[DocChunk]) -> np.ndarray:
+        """Vectorize `chunks` with the frozen vocabulary/IDF and append them to the smallest shard."""
+        chunks = list(chunks)
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        mat = self.vectorizer.transform([c.text for c in chunks]).tocsr()
+        with self._lock:
+            self._tombstone([(c.doc_id, c.chunk_id) for c in chunks])
+            start = len(self.chunks)
+            docnos = np.arange(start, start + len(chunks), dtype=np.int64)
+            self.chunks.extend(chunks)
+            self.live = np.concatenate([self.live, np.ones(len(chunks), dtype=bool)])
+            for i, c in zip(docnos, chunks):
+                self._docno_of[(c.doc_id, c.chunk_id)] = int(i)
+            s = int(np.argmin(self._shard_rows))
+            self._pools[s].submit(_shard_add, mat, docnos).result()
+            self._shard_rows[s] += len(chunks)
+            self._shard_docnos[s] = np.concatenate([self._shard_docnos[s], docnos])
+            self.version += 1
+        return docnos
+
+    def update_chunk(self, chunk: DocChunk) -> int:
+        return int(self.add_chunks([chunk])[0])
+
+    def remove_chunks(self, keys: Iterable[Tuple[str, str]]) -> int:
+        with self._lock:
+            n = self._tombstone(keys)
+            if n:
+                self.version += 1
+        return n
+
+    def _tombstone(self, keys: Iterable[Tuple[str, str]]) -> int:
+        self.chunks, self.live, n = tombstoned(self.chunks, self.live, self._docno_of, keys)
+        return n
+
+    # ---- search ----
+
+    def search(self, query: str, top_k: int = 10, admissible: Admissible = None) -> List[RetrievalResult]:
+        return self.search_batch([query], top_k=top_k, admissible=[admissible])[0]
+
+    def iter_search(
+        self,
+        query: str,
+        top_k: int = 10,
+        admissible: Admissible = None,
+        block_size: int = 8,
+    ) -> Iterator[RetrievalResult]:
+        """Same results as `search`; shards return whole top-k lists, so there is no per-block saving."""
+        yield from self.search(query, top_k=top_k, admissible=admissible)
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        top_k: int = 10,
+        admissible: Optional[Sequence[Admissible]] = None,
+    ) -> List[List[RetrievalResult]]:
+        """Fan the batch out to every shard at once, then merge the per-shard top-k lists per query."""
+        if admissible is not None and len(admissible) != len(queries):
+            raise ValueError(f"got {len(admissible)} admissible specs for {len(queries)} queries")
+        if not queries:
+            return []
+        q = self.vectorizer.transform(queries).tocsr()
+        with self._lock:
+            live, chunks, shard_docnos = self.live, self.chunks, list(self._shard_docnos)
+            allowed = []
+            for qi in range(len(queries)):
+                mask = resolve_admissible(admissible[qi] if admissible is not None else None, len(live), self._docno_of)
+                allowed.append(live if mask is None else live & mask)
+        futures = []
+        for pool, docnos in zip(self._pools, shard_docnos):
+            masks = [None if a[docnos].all() else np.packbits(a[docnos]) for a in allowed]
+            futures.append(pool.submit(_shard_top_k, q, masks, top_k))
+        parts = [f.result() for f in futures]
+
+        out = []
+        for qi in range(len(queries)):
+            docnos = np.concatenate([p[qi][0] for p in parts])
+            scores = np.concatenate([p[qi][1] for p in parts])
+            best = np.lexsort((docnos, -scores))[:top_k]
+            out.append(present_results(chunks, docnos[best], scores[best]))
+        return out
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import mmap
+import os
+from collections.abc import Sequence as _SequenceABC
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .policy import _Categorical, _parse_date
+from .types import DocChunk, PolicyMetadata
+
+
+def key_hash(doc_id: str, chunk_id: str) -> int:
+    """Stable 64-bit hash of a (doc_id, chunk_id) key."""
+    digest = hashlib.blake2b(f"{doc_id}\x00{chunk_id}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class _Strings:
+    """UTF-8 string column: a read-only blob (memory-mapped after `open`), an in-memory tail for rows
+    appended since, and row offsets into their concatenation."""
+    def __init__(self):
+        self._blob: Union[bytes, mmap.mmap] = b""
+        self._tail = bytearray()
+        self.offsets = np.zeros(1, dtype=np.int64)
+
+    def extend(self, values: Sequence[str]) -> None:
+        lengths = np.empty(len(values), dtype=np.int64)
+        for i, v in enumerate(values):
+            data = v.encode("utf-8")
+            self._tail += data
+            lengths[i] = len(data)
+        self.offsets = np.concatenate([self.offsets, self.offsets[-1] + np.cumsum(lengths)])
+
+    def get(self, row: int) -> str:
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        base = len(self._blob)
+        data = self._blob[start:end] if end <= base else self._tail[start - base:end - base]
+        return bytes(data).decode("utf-8")
+
+    def nbytes(self) -> int:
+        return len(self._blob) + len(self._tail) + self.offsets.nbytes
+
+    def save(self, path: str, name: str) -> None:
+        with open(os.path.join(path, f"{name}.bin"), "wb") as f:
+            f.write(self._blob)
+            f.write(self._tail)
+        np.save(os.path.join(path, f"{name}.offsets.npy"), self.offsets)
+
+    @classmethod
+    def open(cls, path: str, name: str) -> "_Strings":
+        self = cls()
+        with open(os.path.join(path, f"{name}.bin"), "rb") as f:
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        self.offsets = np.load(os.path.join(path, f"{name}.offsets.npy"), mmap_mode="r")
+        return self
+
+
+class ChunkView:
+    """Read-only `DocChunk` stand-in for one row of a ChunkStore. Text and metadata are decoded on access."""
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "ChunkStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def doc_id(self) -> str:
+        return self._store._doc_id.get(self._row)
+
+    @property
+    def chunk_id(self) -> str:
+        return self._store._chunk_id.get(self._row)
+
+    @property
+    def text(self) -> str:
+        return self._store.text(self._row)
+
+    @property
+    def metadata(self) -> PolicyMetadata:
+        return self._store.metadata(self._row)
+
+    def to_chunk(self) -> DocChunk:
+        return DocChunk(doc_id=self.doc_id, chunk_id=self.chunk_id, text=self.text, metadata=self.metadata)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ChunkView) and other._store is self._store:
+            return other._row == self._row
+        if isinstance(other, (ChunkView, DocChunk)):
+            return (self.doc_id, self.chunk_id, self.text, self.metadata) == (
+                other.doc_id, other.chunk_id, other.text, other.metadata
+            )
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.doc_id, self.chunk_id))
+
+    def __reduce__(self):
+        # pickled (result cache, worker processes) as a plain DocChunk, not with the whole store
+        return DocChunk, (self.doc_id, self.chunk_id, self.text, self.metadata)
+
+    def __repr__(self) -> str:
+        return f"ChunkView(doc_id={self.doc_id!r}, chunk_id={self.chunk_id!r}, row={self._row})"
+
+
+Chunk = Union[DocChunk, ChunkView]
+
+
+class ChunkStore(_SequenceABC):
+    """Columnar chunk storage usable wherever a list of chunks is expected (e.g. `TfidfRetriever(store)`).
+
+    Ids and texts are UTF-8 blobs plus offsets, policy metadata are dictionary-encoded NumPy
+    columns, and non-empty `extra` dicts are kept per row in a side dict. Indexing returns a
+    `ChunkView` (None for removed rows), so no per-chunk objects are held. `save` writes the store
+    to a directory and `open` memory-maps it; rows appended after `open` are kept in memory.
+    `ChunkKeys` looks rows up by (doc_id, chunk_id) through the `key_hash` column.
+    """
+    _FORMAT = 2
+    _INT_COLUMNS = ("ttl_days", "has_ttl", "contains_pii", "removed", "key_hash")
+    _STRINGS = ("doc_id", "chunk_id", "text")
+    _CATEGORICAL = ("license", "jurisdiction", "source_class", "created_at")
+
+    def __init__(self, chunks: Iterable[Chunk] = ()):
+        for name in self._STRINGS:
+            setattr(self, f"_{name}", _Strings())
+        for name in self._CATEGORICAL:
+            setattr(self, f"_{name}", _Categorical([]))
+        self._ttl_days = np.zeros(0, dtype=np.int64)
+        self._has_ttl = np.zeros(0, dtype=bool)
+        self._contains_pii = np.zeros(0, dtype=bool)
+        self._removed = np.zeros(0, dtype=bool)
+        self._key_hash = np.zeros(0, dtype=np.uint64)
+        self._key_order: Optional[Tuple[np.ndarray, np.ndarray]] = None  # as saved; see `key_order`
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        self.extend(chunks)
+
+    # ---- building ----
+
+    def extend(self, chunks: Iterable[Chunk], batch_size: int = 65536) -> None:
+        batch: List[Chunk] = []
+        for c in chunks:
+            batch.append(c)
+            if len(batch) >= batch_size:
+                self._append(batch)
+                batch = []
+        if batch:
+            self._append(batch)
+
+    def append(self, chunk: Chunk) -> None:
+        self._append([chunk])
+
+    def _append(self, chunks: Sequence[Chunk]) -> None:
+        start = len(self)
+        metas = [c.metadata for c in chunks]
+        doc_ids, chunk_ids = [c.doc_id for c in chunks], [c.chunk_id for c in chunks]
+        self._text.extend([c.text for c in chunks])
+        self._doc_id.extend(doc_ids)
+        self._chunk_id.extend(chunk_ids)
+        hashes = np.fromiter((key_hash(d, c) for d, c in zip(doc_ids, chunk_ids)), dtype=np.uint64, count=len(chunks))
+        self._key_hash = np.concatenate([self._key_hash, hashes])
+        self._license.extend([m.license for m in metas])
+        self._jurisdiction.extend([m.jurisdiction for m in metas])
+        self._source_class.extend([m.source_class for m in metas])
+        self._created_at.extend([m.created_at for m in metas])
+        self._ttl_days = np.concatenate([self._ttl_days, [m.ttl_days or 0 for m in metas]]).astype(np.int64)
+        self._has_ttl = np.concatenate([self._has_ttl, [m.ttl_days is not None for m in metas]]).astype(bool)
+        self._contains_pii = np.concatenate([self._contains_pii, [bool(m.contains_pii) for m in metas]]).astype(bool)
+        self._removed = np.concatenate([self._removed, np.zeros(len(chunks), dtype=bool)])
+        for i, m in enumerate(metas):
+            if m.extra:
+                self._extra[start + i] = dict(m.extra)
+
+    # ---- Sequence protocol (+ tombstoning, as retrievers do with their chunk lists) ----
+
+    def __len__(self) -> int:
+        return len(self._removed)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("ChunkStore index out of range")
+        return None if self._removed[index] else ChunkView(self, int(index))
+
+    def __setitem__(self, index: int, value: None) -> None:
+        """Only `store[i] = None` (remove a row) is supported; rows are otherwise immutable."""
+        if value is not None:
+            raise TypeError("ChunkStore rows are immutable; append a new chunk instead")
+        self._removed[index] = True
+
+    def without(self, rows: Sequence[int]) -> "ChunkStore":
+        """A copy with `rows` removed, sharing every column but the removal flags with this store,
+        which is left unchanged (copy-on-write removal; later appends never alter existing rows)."""
+        out = copy.copy(self)
+        out._removed = self._removed.copy()
+        out._removed[np.asarray(rows, dtype=np.int64)] = True
+        return out
+
+    # ---- row access ----
+
+    def text(self, row: int) -> str:
+        return self._text.get(row)
+
+    def key(self, row: int) -> Tuple[str, str]:
+        return self._doc_id.get(row), self._chunk_id.get(row)
+
+    def key_order(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows sorted by key hash, their sorted hashes); saved with the store, so memory-mapped after `open`."""
+        if self._key_order is None or len(self._key_order[0]) != len(self):
+            order = np.argsort(self._key_hash, kind="stable")
+            self._key_order = order, self._key_hash[order]
+        return self._key_order
+
+    def metadata(self, row: int) -> PolicyMetadata:
+        return PolicyMetadata(
+            license=self._license.value(self._license.codes[row]),
+            ttl_days=int(self._ttl_days[row]) if self._has_ttl[row] else None,
+            created_at=self._created_at.value(self._created_at.codes[row]),
+            contains_pii=bool(self._contains_pii[row]),
+            jurisdiction=self._jurisdiction.value(self._jurisdiction.codes[row]),
+            source_class=self._source_class.value(self._source_class.codes[row]),
+            extra=dict(self._extra.get(row, {})),
+        )
+
+    def metadata_columns(self) -> Dict:
+        """Columns in the layout `PolicyColumns` builds, without materializing per-row metadata."""
+        def expand(col: _Categorical, fill=None) -> List:
+            values = [fill if v is None and fill is not None else v for v in col.values]
+            return [values[c] for c in col.codes]
+
+        created = [_parse_date(v) for v in self._created_at.values]
+        created_day = np.array([d.toordinal() if d else 0 for d in created] or [0], dtype=np.int64)
+        has_created = np.array([d is not None for d in created] or [False], dtype=bool)
+        return {
+            "license": expand(self._license),
+            "jurisdiction": expand(self._jurisdiction, fill="unknown"),
+            "source_class": expand(self._source_class),
+            "contains_pii": self._contains_pii.copy(),
+            "has_ttl": self._has_ttl.copy(),
+            "ttl_days": self._ttl_days.copy(),
+            "has_created": has_created[self._created_at.codes],
+            "created_day": created_day[self._created_at.codes],
+        }
+
+    def nbytes(self) -> int:
+        """Approximate size of the column arrays and string blobs (dictionaries excluded)."""
+        arrays = [getattr(self, f"_{name}") for name in self._INT_COLUMNS]
+        arrays += [getattr(self, f"_{name}").codes for name in self._CATEGORICAL]
+        strings = sum(getattr(self, f"_{name}").nbytes() for name in self._STRINGS)
+        return strings + sum(a.nbytes for a in arrays)
+
+    # ---- persistence ----
+
+    def save(self, path: str) -> None:
+        """Write the store to directory `path` (string blobs, offsets and columns as .npy, dictionaries as JSON)."""
+        os.makedirs(path, exist_ok=True)
+        for name in self._STRINGS:
+            getattr(self, f"_{name}").save(path, name)
+        order, sorted_hashes = self.key_order()
+        np.save(os.path.join(path, "key_order.npy"), order)
+        np.save(os.path.join(path, "key_sorted.npy"), sorted_hashes)
+        for name in self._INT_COLUMNS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, f"_{name}"))
+        for name in self._CATEGORICAL:
+            np.save(os.path.join(path, f"{name}.codes.npy"), getattr(self, f"_{name}").codes)
+        meta = {
+            "format": self._FORMAT,
+            "values": {name: getattr(self, f"_{name}").values for name in self._CATEGORICAL},
+            "extra": {str(row): extra for row, extra in self._extra.items()},
+        }
+        with open(os.path.join(path, "store.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def open(cls, path: str) -> "ChunkStore":
+        """Open a store written by `save`; the string blobs and columns are memory-mapped."""
+        with open(os.path.join(path, "store.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != cls._FORMAT:
+            raise ValueError(f"unsupported chunk store format {meta.get('format')!r} at {path}")
+        self = cls()
+        for name in cls._STRINGS:
+            setattr(self, f"_{name}", _Strings.open(path, name))
+        self._key_order = tuple(np.load(os.path.join(path, f"key_{name}.npy"), mmap_mode="r") for name in ("order", "sorted"))
+        for name in cls._INT_COLUMNS:
+            setattr(self, f"_{name}", np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+        self._removed = np.array(self._removed)  # writable: rows can be removed after opening
+        for name in cls._CATEGORICAL:
+            col = _Categorical(meta["values"][name])
+            col.codes = np.load(os.path.join(path, f"{name}.codes.npy"), mmap_mode="r")
+            setattr(self, f"_{name}", col)
+        self._extra = {int(row): extra for row, extra in meta["extra"].items()}
+        return self
+
+
+class ChunkKeys:
+    """(doc_id, chunk_id) -> row lookup over a ChunkStore, used as a retriever's doc-number map.
+
+    Rows present when it is built are found by binary search over the store's sorted key hashes, so
+    no per-row Python objects are created; the newest live row with the key wins. Assignments and
+    removals made afterwards (`keys[key] = row`, `pop`) are kept in a dict of the changed keys.
+    """
+    def __init__(self, store: ChunkStore):
+        self._store = store
+        self._n = len(store)
+        self._order, self._sorted = store.key_order()  # rows appended later go to `_changed`
+        self._changed: Dict[Tuple[str, str], Optional[int]] = {}
+
+    def _base_row(self, key: Tuple[str, str]) -> Optional[int]:
+        store = self._store
+        h = np.uint64(key_hash(*key))
+        lo = int(np.searchsorted(self._sorted, h))
+        best = None
+        while lo < self._n and self._sorted[lo] == h:
+            row = int(self._order[lo])
+            if not store._removed[row] and (best is None or row > best) and store.key(row) == key:
+                best = row
+            lo += 1
+        return best
+
+    def get(self, key: Tuple[str, str], default: Optional[int] = None) -> Optional[int]:
+        key = tuple(key)
+        row = self._changed[key] if key in self._changed else self._base_row(key)
+        return default if row is None else row
+
+    def pop(self, key: Tuple[str, str], default: Optional[int] = None) -> Optional[int]:
+        key = tuple(key)
+        row = self.get(key)
+        self._changed[key] = None
+        return default if row is None else row
+
+    def __setitem__(self, key: Tuple[str, str], row: int) -> None:
+        self._changed[tuple(key)] = int(row)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return self.get(key) is not None
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from .auditing import AuditConfig, _AuditCore, _audit_cores
+from .leasing import DefaultCalibrator, LeasingConfig, as_batch_calibrator, log_odds, sigmoid
+from .retrieval import RetrievalResult
+from .types import ClaimAudit, LeasedEvidence
+
+C = TypeVar("C")
+
+
+def config_grid(base: C, **values: Sequence) -> List[C]:
+    """Every combination of `values` applied to `base` (a config dataclass), last field varying fastest.
+
+    `config_grid(LeasingConfig(), tau=[0.8, 0.9], c_max=[5, 10])` gives four LeasingConfigs.
+    """
+    names = list(values)
+    return [replace(base, **dict(zip(names, combo))) for combo in itertools.product(*(values[n] for n in names))]
+
+
+@dataclass
+class SweepResult:
+    leasing: LeasingConfig
+    auditing: AuditConfig
+    leased: List[LeasedEvidence]
+    final_belief: float
+    final_cost: float
+    audit: ClaimAudit
+
+
+class ConfigSweep:
+    """Evaluate grids of LeasingConfig x AuditConfig over one ranked list, as if `EvidenceLeaser.lease`
+    and `CounterfactualAuditor.audit_claim` were run once per combination.
+
+    Candidates are calibrated once (one `calibrate_batch` call over as many as the largest
+    `max_steps` needs), so the calibrator must score each candidate independently of its batch,
+    as `DefaultCalibrator` does. Leasing then advances every leasing config together, one
+    candidate at a time, on the shared log-odds. Audits depend only on the leased set, so each
+    distinct set is audited once for the whole audit grid from one sort and cumulative sum.
+    """
+    def __init__(self, calibrator: Optional[Callable] = None):
+        self.calibrator = as_batch_calibrator(calibrator or DefaultCalibrator())
+
+    def run(
+        self,
+        query: str,
+        ranked: Iterable[RetrievalResult],
+        leasing: Sequence[LeasingConfig],
+        auditing: Sequence[AuditConfig] = (AuditConfig(),),
+        prior: float = 0.5,
+        claim: Optional[str] = None,
+    ) -> List[SweepResult]:
+        """One result per (leasing, auditing) pair, leasing-major. Audits are labelled `claim` (default: the query)."""
+        leasing, auditing = list(leasing), list(auditing)
+        if not leasing or not auditing:
+            return []
+        depth = max(cfg.max_steps for cfg in leasing)
+        candidates = list(itertools.islice(iter(ranked), depth))
+        likelihoods = np.asarray(
+            self.calibrator.calibrate_batch(query, [r.chunk for r in candidates], np.array([r.score for r in candidates])),
+            dtype=np.float64,
+        ) if candidates else np.empty(0)
+        take, deltas, beliefs, costs = self._lease_grid(log_odds(likelihoods), leasing, prior)
+
+        claim = query if claim is None else claim
+        prior_lo = float(log_odds(prior))
+        audits: Dict[Tuple[int, ...], List[_AuditCore]] = {}
+        out = []
+        for g, lcfg in enumerate(leasing):
+            idx = tuple(int(i) for i in np.flatnonzero(take[g]))
+            leased = [
+                LeasedEvidence(
+                    chunk=candidates[i].chunk,
+                    retrieval_score=candidates[i].score,
+                    likelihood=float(likelihoods[i]),
+                    delta_belief=float(deltas[g, i]),
+                    cost=lcfg.per_snippet_cost,
+                )
+                for i in idx
+            ]
+            if idx not in audits:
+                audits[idx] = _audit_cores(likelihoods[list(idx)], [candidates[i].chunk.chunk_id for i in idx], prior_lo, auditing)
+            for acfg, core in zip(auditing, audits[idx]):
+                audit = ClaimAudit(
+                    claim=claim,
+                    posterior=core.posterior,
+                    interval=core.interval,
+                    minimal_support=[leased[i] for i in core.support],
+                    necessity=dict(core.necessity),
+                    sufficiency=dict(core.sufficiency),
+                    cfs=core.cfs,
+                )
+                out.append(SweepResult(lcfg, acfg, leased, float(beliefs[g]), float(costs[g]), audit))
+        return out
+
+    @staticmethod
+    def _lease_grid(llr: np.ndarray, grid: Sequence[LeasingConfig], prior: float):
+        """(taken (G, n) bool, delta belief (G, n), final belief (G,), final cost (G,)) for G configs."""
+        param = lambda name: np.array([getattr(cfg, name) for cfg in grid], dtype=np.float64)
+        tau, c_max, alpha, step_cost = param("tau"), param("c_max"), param("alpha_cost"), param("per_snippet_cost")
+        max_steps = np.array([cfg.max_steps for cfg in grid])
+        n = len(llr)
+        lo = np.full(len(grid), float(log_odds(prior)))
+        belief = np.full(len(grid), prior)
+        cost = np.zeros(len(grid))
+        active = np.ones(len(grid), dtype=bool)
+        take = np.zeros((len(grid), n), dtype=bool)
+        deltas = np.zeros((len(grid), n))
+        for i in range(n):
+            # the stop criteria of EvidenceLeaser.lease; once a config stops it stays stopped
+            active &= (i < max_steps) & (belief < tau) & (cost + step_cost <= c_max)
+            if not active.any():
+                break
+            new_lo = lo + llr[i]
+            # the scalar `sigmoid` of `lease` (np.exp may round differently), once per distinct log-odds
+            uniq, inverse = np.unique(new_lo, return_inverse=True)
+            new_belief = np.array([sigmoid(x) for x in uniq.tolist()])[inverse]
+            delta = new_belief - belief
+            t = active & (delta - alpha * step_cost > 0)
+            take[:, i] = t
+            deltas[:, i] = delta
+            lo = np.where(t, new_lo, lo)
+            belief = np.where(t, new_belief, belief)
+            cost = np.where(t, cost + step_cost, cost)
+        return take, deltas, belief, cost
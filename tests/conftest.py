@@ -0,0 +1,27 @@
+from dataclasses import replace
+
+import pytest
+
+from belrag.bench import synthetic_corpus, synthetic_queries
+from belrag.types import PolicyMetadata
+
+_LICENSES = ["cc-by", "internal", "proprietary"]
+
+
+@pytest.fixture(scope="session")
+def corpus():
+    """Synthetic chunks plus three shifted copies of the first 40, so queries taken from those
+    match several admissible chunks and lease more than one piece of evidence."""
+    base = synthetic_corpus(2_000, seed=0)
+    chunks = [replace(c, metadata=PolicyMetadata(license=_LICENSES[i % 3])) if i < 40 else c for i, c in enumerate(base)]
+    chunks += [
+        replace(c, doc_id=f"{c.doc_id}-v{k}", text=" ".join(c.text.split()[k:]), metadata=PolicyMetadata(license=_LICENSES[k]))
+        for c in base[:40]
+        for k in (1, 2)
+    ]
+    return chunks
+
+
+@pytest.fixture(scope="session")
+def queries(corpus):
+    return [" ".join(c.text.split()[3:11]) for c in corpus[:40:4]] + synthetic_queries(corpus, 4, seed=1)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from belrag.auditing import AuditConfig, CounterfactualAuditor
+from belrag.types import DocChunk, LeasedEvidence, PolicyMetadata
+
+
+def _evidence(rng, n, ids):
+    lo, hi = rng.choice([0.05, 0.3, 0.45]), rng.choice([0.55, 0.7, 0.95])
+    out = [
+        LeasedEvidence(DocChunk("d", ids[i], "text", PolicyMetadata()), 0.5, float(rng.uniform(lo, hi)), 0.0, 1.0)
+        for i in range(n)
+    ]
+    if n > 1 and rng.random() < 0.3:
+        out[0].likelihood = out[-1].likelihood  # ties keep input order
+    return out
+
+
+@pytest.mark.parametrize("shared_ids", [False, True])
+def test_closed_form_audit_matches_sequential(shared_ids):
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        auditor = CounterfactualAuditor(AuditConfig(tau=rng.choice([0.6, 0.85, 0.99]), alpha=rng.random(), beta=rng.random()))
+        n = int(rng.integers(0, 25))
+        ids = [str(rng.choice(list("abcde"))) if shared_ids else f"c{i}" for i in range(n)]
+        evidence = _evidence(rng, n, ids)
+        prior = float(rng.choice([0.2, 0.5, 0.8]))
+        fast = auditor.audit_claim("x", evidence, prior)
+        ref = auditor._audit_claim_sequential("x", evidence, prior)
+        assert fast.posterior == pytest.approx(ref.posterior, abs=1e-9)
+        assert fast.interval == pytest.approx(ref.interval, abs=1e-9)
+        assert [id(e) for e in fast.minimal_support] == [id(e) for e in ref.minimal_support]
+        assert fast.necessity == ref.necessity
+        assert fast.sufficiency == ref.sufficiency
+        assert fast.cfs == pytest.approx(ref.cfs, abs=1e-12)
+
+
+def test_audit_claims_cache_matches_uncached():
+    rng = np.random.default_rng(1)
+    evidence = _evidence(rng, 12, [f"c{i}" for i in range(12)])
+    cached = CounterfactualAuditor(AuditConfig(cache_size=8))
+    uncached = CounterfactualAuditor(AuditConfig(cache_size=0))
+    claims = ["a", "b", "a"]
+    assert cached.audit_claims(claims, evidence) == uncached.audit_claims(claims, evidence)
+    assert cached.cache_info()["hits"] == 2
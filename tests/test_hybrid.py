@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from belrag.dense import DenseRetriever, HashingEmbedder
+from belrag.hybrid import HybridRetriever
+
+
+@pytest.mark.parametrize("fusion", ["linear", "rrf"])
+def test_batched_pass_matches_per_query(corpus, queries, fusion):
+    hybrid = HybridRetriever(corpus, HashingEmbedder(), fusion=fusion)
+    mask = np.arange(len(corpus)) % 3 != 0
+    batched = hybrid.search_batch(queries, top_k=10, admissible=[mask] * len(queries))
+    for q, got in zip(queries, batched):
+        assert got == hybrid.search(q, top_k=10, admissible=mask)
+        assert got == list(hybrid.iter_search(q, top_k=10, admissible=mask, block_size=3))
+        assert all(mask[hybrid.dense._docno_of[(r.chunk.doc_id, r.chunk.chunk_id)]] for r in got)
+
+
+def test_dense_only_fusion_matches_dense_retriever(corpus, queries):
+    embed = HashingEmbedder()
+    hybrid = HybridRetriever(corpus, embed, fusion="linear", weight=1.0)
+    dense = DenseRetriever(corpus, embed, n_lists=1)
+    for q in queries:
+        got = hybrid.search(q, top_k=10)
+        ref = [r for r in dense.search(q, top_k=10) if r.score > 0]
+        assert [r.chunk for r in got[:len(ref)]] == [r.chunk for r in ref]
+        assert [r.score for r in got[:len(ref)]] == pytest.approx([r.score for r in ref])
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from belrag.generation import SimpleGenerator
+from belrag.pipeline import BELRAGConfig, BELRAGPipeline
+from belrag.retrieval import TfidfRetriever
+
+
+def assert_same_output(a, b):
+    """Everything but timings and cache statistics, which depend on call order."""
+    assert a.answer == b.answer
+    assert a.claims == b.claims
+    assert a.leased == b.leased
+    assert a.policy_log == b.policy_log
+    assert a.debug["el"]["belief_trace"] == b.debug["el"]["belief_trace"]
+
+
+@pytest.mark.parametrize("scoring", ["exhaustive", "maxscore"])
+def test_search_batch_matches_iter_search(corpus, queries, scoring):
+    retriever = TfidfRetriever(corpus, scoring=scoring)
+    batched = retriever.search_batch(queries, top_k=15)
+    assert batched == [list(retriever.iter_search(q, top_k=15, block_size=4)) for q in queries]
+
+
+def test_run_many_matches_run(corpus, queries):
+    cfg = BELRAGConfig(allowed_licenses=["cc-by", "internal"])
+    many = BELRAGPipeline(corpus, cfg).run_many(queries)
+    single = BELRAGPipeline(corpus, cfg)
+    for q, out in zip(queries, many):
+        assert_same_output(out, single.run(q))
+
+
+class _WholeDraftGenerator:
+    """A generator without `stream_draft`: the draft arrives as one string."""
+    def __init__(self):
+        self._inner = SimpleGenerator()
+
+    def __getattr__(self, name):
+        if name == "stream_draft":
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+
+def test_run_stream_matches_run(corpus, queries):
+    streaming = BELRAGPipeline(corpus)
+    whole = BELRAGPipeline(corpus)
+    whole.generator = _WholeDraftGenerator()
+    for q in queries:
+        events = list(streaming.run_stream(q))
+        kinds = [e.kind for e in events]
+        assert kinds == ["draft"] * kinds.count("draft") + ["claim"] * kinds.count("claim") + ["output"]
+        out = events[-1].output
+        assert_same_output(out, whole.run(q))
+        draft = "".join(e.text for e in events if e.kind == "draft")
+        claims = [e for e in events if e.kind == "claim"]
+        assert [e.audit for e in claims] == out.claims
+        assert out.answer == "\n".join([draft, "", "Calibrated claim report:"] + [e.text for e in claims])
+
+
+def test_arun_stream_matches_run_stream(corpus, queries):
+    pipeline = BELRAGPipeline(corpus)
+
+    async def collect(q):
+        return [e async for e in pipeline.arun_stream(q)]
+
+    for q in queries[:4]:
+        got = asyncio.run(collect(q))
+        ref = list(pipeline.run_stream(q))
+        assert [(e.kind, e.text, e.audit) for e in got] == [(e.kind, e.text, e.audit) for e in ref]
+        assert_same_output(got[-1].output, ref[-1].output)
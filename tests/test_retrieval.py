@@ -0,0 +1,32 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from belrag.retrieval import TfidfRetriever
+
+
+def _assert_same_ranking(fast, ref):
+    assert [r.chunk for r in fast] == [r.chunk for r in ref]
+    assert [r.score for r in fast] == pytest.approx([r.score for r in ref], abs=1e-12)
+
+
+@pytest.mark.parametrize("top_k", [1, 15, 100])
+def test_maxscore_matches_exhaustive(corpus, queries, top_k):
+    exhaustive = TfidfRetriever(corpus, scoring="exhaustive")
+    maxscore = TfidfRetriever(corpus, scoring="maxscore")
+    mask = np.arange(len(corpus)) % 5 != 2
+    for admissible in (None, mask):
+        specs = [admissible] * len(queries)
+        for fast, ref in zip(maxscore.search_batch(queries, top_k, specs), exhaustive.search_batch(queries, top_k, specs)):
+            _assert_same_ranking(fast, ref)
+
+
+def test_maxscore_matches_exhaustive_after_updates(corpus, queries):
+    exhaustive = TfidfRetriever(corpus, scoring="exhaustive")
+    maxscore = TfidfRetriever(corpus, scoring="maxscore")
+    for r in (exhaustive, maxscore):
+        r.add_chunks([replace(c, doc_id=f"{c.doc_id}-new") for c in corpus[:30]])
+        r.remove_chunks([(c.doc_id, c.chunk_id) for c in corpus[:40:3]])
+    for q in queries:
+        _assert_same_ranking(list(maxscore.iter_search(q, top_k=15, block_size=4)), exhaustive.search(q, top_k=15))
@@ -0,0 +1,38 @@
+from dataclasses import replace
+
+import numpy as np
+
+from belrag.pipeline import BELRAGConfig, BELRAGPipeline
+from belrag.retrieval import TfidfRetriever
+from belrag.sharded import ShardedRetriever
+
+
+def _assert_same_results(sharded, single, queries):
+    mask = np.arange(len(single.chunks)) % 4 != 1
+    masks = [mask if i % 2 else None for i in range(len(queries))]
+    assert sharded.search_batch(queries, top_k=15, admissible=masks) == single.search_batch(queries, top_k=15, admissible=masks)
+    for q, m in zip(queries, masks):
+        assert list(sharded.iter_search(q, top_k=15, admissible=m, block_size=4)) == single.search(q, top_k=15, admissible=m)
+
+
+def test_sharded_matches_unsharded(corpus, queries):
+    single = TfidfRetriever(corpus)
+    with ShardedRetriever(corpus, n_shards=3) as sharded:
+        _assert_same_results(sharded, single, queries)
+        # incremental updates must keep the shards in step with the unsharded index
+        added = [replace(c, doc_id=f"{c.doc_id}-new") for c in corpus[:30]]
+        removed = [(c.doc_id, c.chunk_id) for c in corpus[40:60]]
+        for r in (sharded, single):
+            r.add_chunks(added)
+            r.remove_chunks(removed)
+        _assert_same_results(sharded, single, queries)
+
+
+def test_sharded_pipeline_matches_unsharded(corpus, queries):
+    cfg = BELRAGConfig(allowed_licenses=["cc-by", "internal"])
+    single = BELRAGPipeline(corpus, cfg)
+    with ShardedRetriever(corpus, n_shards=2) as retriever:
+        pipeline = BELRAGPipeline(cfg=cfg, retriever=retriever)
+        for q in queries:
+            a, b = pipeline.run(q), single.run(q)
+            assert (a.answer, a.claims, a.leased, a.policy_log) == (b.answer, b.claims, b.leased, b.policy_log)
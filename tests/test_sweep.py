@@ -0,0 +1,29 @@
+import numpy as np
+
+from belrag.auditing import AuditConfig, CounterfactualAuditor
+from belrag.leasing import EvidenceLeaser, LeasingConfig
+from belrag.retrieval import RetrievalResult
+from belrag.sweep import ConfigSweep, config_grid
+from belrag.types import DocChunk, PolicyMetadata
+
+
+def test_sweep_matches_per_config_loop():
+    leasing = config_grid(LeasingConfig(), tau=[0.6, 0.85, 0.99], c_max=[1, 3, 10], alpha_cost=[0.0, 0.05], max_steps=[5, 20])
+    auditing = config_grid(AuditConfig(cache_size=0), tau=[0.5, 0.85, 0.99], alpha=[0.3, 0.5], beta=[0.5])
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        scores = np.sort(rng.uniform(0.0, 0.7, 25))[::-1]
+        # repeated chunk_ids exercise the grouped necessity test
+        ranked = [
+            RetrievalResult(DocChunk(f"d{i}", f"c{rng.integers(5)}", "text", PolicyMetadata()), float(s))
+            for i, s in enumerate(scores)
+        ]
+        got = iter(ConfigSweep().run("q", ranked, leasing, auditing, prior=0.3))
+        for lcfg in leasing:
+            leased, debug = EvidenceLeaser(lcfg).lease("q", ranked, prior=0.3)
+            for acfg in auditing:
+                r = next(got)
+                assert (r.leasing, r.auditing) == (lcfg, acfg)
+                assert r.leased == leased
+                assert (r.final_belief, r.final_cost) == (debug["final_belief"], debug["final_cost"])
+                assert r.audit == CounterfactualAuditor(acfg).audit_claim("q", leased, prior=0.3)
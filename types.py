@@ -67,3 +67,16 @@ class BELRAGOutput:
     leased: List[LeasedEvidence]
     policy_log: Dict[str, Any]
     debug: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class StreamEvent:
+    """One item of `BELRAGPipeline.run_stream`.
+
+    kind "draft": `text` is the next piece of the draft; "claim": `audit` is a finished ClaimAudit
+    and `text` its report entry; "output": `output` is the complete BELRAGOutput (always last).
+    """
+    kind: str
+    text: str = ""
+    audit: Optional[ClaimAudit] = None
+    output: Optional[BELRAGOutput] = None